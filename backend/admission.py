@@ -0,0 +1,224 @@
+"""
+Admission control and load shedding per endpoint.
+
+Each endpoint is served through a limiter with a concurrency limit, a bounded
+wait queue and a maximum wait. Requests that find the queue full are rejected
+at once with 429, and requests that wait too long get 503; both carry
+Retry-After. Heavy endpoints share a small pool so they can never occupy every
+worker thread, and the probes (/health, /ready, /admission) bypass admission
+entirely, so they keep answering under load.
+
+Limits are per worker process and sized from UIDAI_WORKER_THREADS, which must
+match gunicorn's --threads. A queued request waits on its own thread, and each
+/events subscriber holds one for its whole connection, so the pools (with
+their queues) are sized from the threads left after the subscribers, and one
+thread is always left over for the probes. UIDAI_ADMISSION gives individual
+endpoints their own limiter, e.g. "get_state_aggregate=1/2/5"
+(concurrency/queue/wait seconds).
+"""
+
+import os
+import threading
+import time
+
+from flask import g, jsonify, request
+
+WORKER_THREADS = int(os.environ.get('UIDAI_WORKER_THREADS', '8'))
+
+# /events connections per worker; each holds a thread while connected
+MAX_SUBSCRIBERS = int(os.environ.get('UIDAI_MAX_SUBSCRIBERS', '0')) or max(1, WORKER_THREADS // 4)
+
+# Threads the pools and subscribers never take, so /health always finds one
+PROBE_THREADS = 1
+
+# Endpoints that scan many rows or score large payloads
+HEAVY_ENDPOINTS = {
+    'get_state_aggregate',
+    'get_history_bulk',
+    'batch_predict',
+    'batch_predict_stream',
+    'get_backtest',
+    'forecast_3_months',
+    'plan_schedule'
+}
+
+# Probes and the admission report itself are never limited. /events holds
+# its thread for the whole connection and has its own subscriber cap.
+EXEMPT_ENDPOINTS = {'health_check', 'readiness_check', 'admission_status', 'static', 'score_events'}
+
+# Request body limits in bytes (None = unlimited); others get the default
+DEFAULT_BODY_LIMIT = int(os.environ.get('UIDAI_MAX_BODY_BYTES', str(1024 * 1024)))
+BODY_LIMITS = {
+    'batch_predict': int(os.environ.get('UIDAI_MAX_BATCH_BODY_BYTES', str(10 * 1024 * 1024))),
+    'batch_predict_stream': None
+}
+
+# Payload size limits checked by the routes
+MAX_BATCH_SCENARIOS = int(os.environ.get('UIDAI_MAX_BATCH_SCENARIOS', '1000'))
+MAX_BULK_LOCATIONS = int(os.environ.get('UIDAI_MAX_BULK_LOCATIONS', '300'))
+
+
+class Limiter:
+    """Concurrency limit with a bounded FIFO-ish wait queue."""
+
+    def __init__(self, name, concurrency, queue, wait_timeout):
+        self.name = name
+        self.concurrency = max(1, int(concurrency))
+        self.queue = max(0, int(queue))
+        self.wait_timeout = float(wait_timeout)
+        self._cond = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.peak_waiting = 0
+
+    def acquire(self):
+        """Return None once admitted, or (status, reason) if the request is shed."""
+        with self._cond:
+            if self.in_flight < self.concurrency and self.waiting == 0:
+                self.in_flight += 1
+                self.admitted += 1
+                return None
+
+            if self.waiting >= self.queue:
+                self.shed_queue_full += 1
+                return 429, 'queue full'
+
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+            deadline = time.monotonic() + self.wait_timeout
+            try:
+                while self.in_flight >= self.concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.shed_timeout += 1
+                        return 503, 'timed out waiting for capacity'
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+
+            self.in_flight += 1
+            self.admitted += 1
+            return None
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify()
+
+    def retry_after(self):
+        """Seconds a shed client should wait: about one wait timeout."""
+        return max(1, int(round(self.wait_timeout)))
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                'concurrency': self.concurrency,
+                'queue': self.queue,
+                'wait_timeout': self.wait_timeout,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'peak_waiting': self.peak_waiting,
+                'admitted': self.admitted,
+                'shed_queue_full': self.shed_queue_full,
+                'shed_timeout': self.shed_timeout
+            }
+
+
+def parse_overrides(spec):
+    """Parse "endpoint=concurrency/queue/wait,..." into {endpoint: (c, q, w)}."""
+    overrides = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        endpoint, _, limits = part.partition('=')
+        values = limits.split('/')
+        try:
+            concurrency = int(values[0])
+            queue = int(values[1]) if len(values) > 1 else 0
+            wait = float(values[2]) if len(values) > 2 else 2.0
+        except (ValueError, IndexError):
+            raise ValueError(f'Invalid UIDAI_ADMISSION entry "{part}"')
+        overrides[endpoint.strip()] = (concurrency, queue, wait)
+    return overrides
+
+
+class AdmissionController:
+    """Limiters for every endpoint plus the Flask hooks that apply them."""
+
+    def __init__(self, threads=WORKER_THREADS, overrides=None, subscribers=MAX_SUBSCRIBERS):
+        self.threads = threads
+        self.subscribers = subscribers
+        # Of the threads left after the subscribers, heavy work gets a
+        # quarter, everything else three eighths, each with a queue of an
+        # eighth; the rest stays free for probes and bursts
+        available = max(1, threads - subscribers)
+        self.pools = {
+            'heavy': Limiter('heavy', max(1, available // 4), max(1, available // 8), 5.0),
+            'standard': Limiter('standard', max(1, available * 3 // 8), max(1, available // 8), 2.0)
+        }
+        self.endpoint_limiters = {
+            endpoint: Limiter(endpoint, *limits) for endpoint, limits in (overrides or {}).items()
+        }
+
+    def thread_budget(self):
+        """Threads the limiters and subscribers can hold at once, against the total."""
+        limiters = list(self.pools.values()) + list(self.endpoint_limiters.values())
+        held = sum(limiter.concurrency + limiter.queue for limiter in limiters)
+        return {
+            'worker_threads': self.threads,
+            'limiter_threads': held,
+            'subscriber_threads': self.subscribers,
+            'probe_threads': self.threads - held - self.subscribers
+        }
+
+    def limiter_for(self, endpoint):
+        if endpoint in self.endpoint_limiters:
+            return self.endpoint_limiters[endpoint]
+        return self.pools['heavy' if endpoint in HEAVY_ENDPOINTS else 'standard']
+
+    def before_request(self):
+        endpoint = request.endpoint
+        if request.method == 'OPTIONS' or endpoint is None or endpoint in EXEMPT_ENDPOINTS:
+            return None
+
+        body_limit = BODY_LIMITS.get(endpoint, DEFAULT_BODY_LIMIT)
+        request.max_content_length = body_limit
+        if body_limit is not None and (request.content_length or 0) > body_limit:
+            return jsonify({'error': f'Request body larger than {body_limit} bytes'}), 413
+
+        limiter = self.limiter_for(endpoint)
+        rejected = limiter.acquire()
+        if rejected is not None:
+            status, reason = rejected
+            response = jsonify({'error': f'Server busy ({reason}), retry later', 'limiter': limiter.name})
+            response.status_code = status
+            response.headers['Retry-After'] = str(limiter.retry_after())
+            return response
+
+        g.admission_limiter = limiter
+        return None
+
+    def teardown_request(self, exc):
+        limiter = g.pop('admission_limiter', None)
+        if limiter is not None:
+            limiter.release()
+
+    def register(self, app):
+        app.before_request(self.before_request)
+        app.teardown_request(self.teardown_request)
+
+    def snapshot(self):
+        return {
+            'pid': os.getpid(),
+            'worker_threads': self.threads,
+            'thread_budget': self.thread_budget(),
+            'pools': {name: limiter.snapshot() for name, limiter in self.pools.items()},
+            'endpoints': {name: limiter.snapshot() for name, limiter in self.endpoint_limiters.items()},
+            'heavy_endpoints': sorted(HEAVY_ENDPOINTS),
+            'limits': {
+                'max_body_bytes': DEFAULT_BODY_LIMIT,
+                'max_batch_scenarios': MAX_BATCH_SCENARIOS,
+                'max_bulk_locations': MAX_BULK_LOCATIONS
+            }
+        }
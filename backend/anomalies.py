@@ -0,0 +1,79 @@
+"""
+Vectorized anomaly scan over every district and month of the master data.
+
+Each metric is compared with the rolling mean and standard deviation of the
+same district's preceding months. The resulting z-scores are computed for all
+rows at once with grouped pandas window operations, and a row is flagged when
+its largest absolute z-score reaches the threshold.
+"""
+
+import pandas as pd
+
+# Metrics scanned, mapped to the column that holds them in the scored frame
+ANOMALY_METRICS = {
+    'd_b': 'd_b',
+    'd_e': 'd_e',
+    'd_c': 'd_c',
+    'mbu': 'score_mbu',
+    'asi': 'score_asi'
+}
+
+# Fallback columns when scores were not precomputed
+FALLBACK_METRICS = {
+    'mbu': 'MBU',
+    'asi': 'ASI_current'
+}
+
+DEFAULT_WINDOW = 3
+DEFAULT_THRESHOLD = 4.0
+
+# Rolling deviations are floored at this fraction of the metric's national
+# spread so near-constant districts do not produce huge z-scores
+STD_FLOOR_FRACTION = 0.5
+
+
+def metric_columns(df):
+    """Return {metric: column} for the metrics available in df."""
+    columns = {}
+    for metric, col in ANOMALY_METRICS.items():
+        if col in df.columns:
+            columns[metric] = col
+        elif metric in FALLBACK_METRICS and FALLBACK_METRICS[metric] in df.columns:
+            columns[metric] = FALLBACK_METRICS[metric]
+    return columns
+
+
+def scan_anomalies(df, window=DEFAULT_WINDOW, threshold=DEFAULT_THRESHOLD):
+    """
+    Score every row against its district's previous months.
+
+    df must be sorted by state, district and month (as scored_df is).
+    Returns the flagged rows sorted by severity, highest first, with one
+    z-score column per metric.
+    """
+    columns = metric_columns(df)
+    keys = [df['state'], df['district']]
+    values = df[list(columns.values())].astype(float)
+    values.columns = list(columns.keys())
+
+    # Statistics of the preceding `window` months, excluding the current one
+    previous = values.groupby(keys, sort=False).shift(1)
+    rolling = previous.groupby(keys, sort=False).rolling(window, min_periods=2)
+    mean = rolling.mean().reset_index(level=[0, 1], drop=True).sort_index()
+    std = rolling.std().reset_index(level=[0, 1], drop=True).sort_index()
+
+    floor = values.std() * STD_FLOOR_FRACTION
+    std = std.clip(lower=floor.where(floor > 0, 1e-9), axis=1)
+    zscores = ((values - mean) / std).add_prefix('z_')
+
+    abs_z = zscores.abs()
+    severity = abs_z.max(axis=1)
+    has_score = severity.notna()
+    driver = abs_z[has_score].idxmax(axis=1).str[2:]
+
+    result = pd.concat([df[['state', 'district', 'month']], values, zscores], axis=1)
+    result['severity'] = severity
+    result['driver'] = driver
+
+    flagged = result[has_score & (severity >= threshold)]
+    return flagged.sort_values('severity', ascending=False, kind='stable').reset_index(drop=True)
@@ -3,80 +3,462 @@ Flask Backend for Aadhaar Stress and Risk Model Prediction
 This server provides endpoints for CSV-based lookups and ML predictions.
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
+import atexit
+import hashlib
 import joblib
 import numpy as np
 import pandas as pd
 import os
+import threading
+import time
+from collections import namedtuple
 from datetime import datetime
 
+import admission
+import batch_scoring
+import scoring
+from backtest import run_backtest, project_origin, add_months, DEFAULT_HORIZONS
+from anomalies import scan_anomalies, DEFAULT_THRESHOLD, DEFAULT_WINDOW
+from model_registry import ModelRegistry, RegistryError, REGISTRY_DIR, MODEL_FILE
+from dataset_query import DatasetIndex, DatasetQueryError, DEFAULT_PAGE_SIZE
+from profiling import register_profiling
+from score_updates import ScoreFeed
+import scheduler
+from surrogate import TreeSurrogate, SURROGATE_FILE, model_fingerprint
+
 app = Flask(__name__)
 CORS(app, origins="*")  # Allow all origins for production (Vercel frontend)
 
 # Get the directory where this script is located
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# Load the model and feature names on startup
-try:
-    model = joblib.load(os.path.join(BASE_DIR, 'uidai_risk_model.pkl'))
-    feature_names = joblib.load(os.path.join(BASE_DIR, 'model_features.pkl'))
-    print("✓ Model and feature importances loaded successfully!")
-    print(f"  Feature names: {list(feature_names)}")
-    print(f"  Model expects {model.n_features_in_} features")
-except Exception as e:
-    print(f"✗ Error loading model files: {e}")
-    model = None
-    feature_names = None
-
-# Load the processed master data CSV
+# With UIDAI_LAZY_LOAD=1 the worker binds its port immediately and loads the
+# model and master data on a background thread. Data routes answer 503 until
+# /ready reports the worker as ready.
+LAZY_LOAD = os.environ.get('UIDAI_LAZY_LOAD', '0').lower() in ('1', 'true', 'yes')
+
+# Seconds clients should wait before retrying while loading is in progress
+RETRY_AFTER_SECONDS = int(os.environ.get('UIDAI_RETRY_AFTER', '5'))
+
+# Seconds between checks for replaced model or data files (0 = never reload)
+REFRESH_INTERVAL = int(os.environ.get('UIDAI_REFRESH_INTERVAL', '30'))
+WATCHED_FILES = ['uidai_risk_model.pkl', 'model_features.pkl', 'processed_master_data.csv', SURROGATE_FILE]
+
+# Everything loaded from the model and data files or derived from them.
+# load_resources builds a complete new bundle and publishes it with a single
+# assignment; handlers read `resources` once, so a request never mixes the
+# model, frames and indexes of two versions.
+Resources = namedtuple('Resources', [
+    'model',
+    'feature_names',
+    'master_df',
+    # Distilled tree used by /predict with mode=fast (see surrogate.py)
+    'surrogate',
+    # Model versions for /predict and /batch-predict (see model_registry.py)
+    'model_registry',
+    # master_df sorted by location and month, with precomputed score columns,
+    # and (state, district) -> row positions into it
+    'scored_df',
+    'location_index',
+    # Column arrays and cached sort orders behind /dataset
+    'dataset_index',
+    # Flagged rows from the anomaly scan
+    'anomaly_table',
+    # Forecast backtest report for DEFAULT_HORIZONS
+    'backtest_report',
+    # resource_version() of the files the bundle was built from
+    'version'
+])
+
+resources = Resources(None, None, None, None, None, None, {}, None, None, None, None)
+
+# Score snapshot and /events subscribers (see score_updates.py)
+score_feed = ScoreFeed()
+
+# Loading progress shared by /health, /ready and the request guard
+load_state = {
+    'status': 'pending',   # pending -> loading -> ready | failed
+    'errors': [],
+    'started_at': None,
+    'finished_at': None,
+    'version': None        # resource_version() of the files in use
+}
+_load_lock = threading.Lock()
+
+
+def load_model_files():
+    """Load the model and feature names, returning (None, None) on failure."""
+    try:
+        loaded_model = joblib.load(os.path.join(BASE_DIR, 'uidai_risk_model.pkl'))
+        loaded_features = joblib.load(os.path.join(BASE_DIR, 'model_features.pkl'))
+        print("✓ Model and feature importances loaded successfully!")
+        print(f"  Feature names: {list(loaded_features)}")
+        print(f"  Model expects {loaded_model.n_features_in_} features")
+        return loaded_model, loaded_features
+    except Exception as e:
+        print(f"✗ Error loading model files: {e}")
+        load_state['errors'].append(f'model: {e}')
+        return None, None
+
+
+def load_surrogate():
+    """
+    Load the distilled surrogate if present; fast mode is optional.
+
+    A surrogate distilled from a different model than uidai_risk_model.pkl
+    is refused, so fast mode is disabled until surrogate.py is rerun.
+    """
+    path = os.path.join(BASE_DIR, SURROGATE_FILE)
+    if not os.path.exists(path):
+        print("  Surrogate model not found, fast mode disabled (run surrogate.py)")
+        return None
+    try:
+        fast_model = TreeSurrogate.load(path)
+        expected = model_fingerprint(os.path.join(BASE_DIR, MODEL_FILE))
+        if fast_model.model_fingerprint != expected:
+            print("✗ Surrogate was distilled from a different model, fast mode disabled "
+                  "(rerun surrogate.py)")
+            return None
+        print(f"✓ Surrogate model loaded (depth {fast_model.depth}, "
+              f"ASI MAE {fast_model.report.get('asi_mae', float('nan')):.2f})")
+        return fast_model
+    except Exception as e:
+        print(f"✗ Error loading surrogate model: {e}")
+        return None
+
+
+def load_model_registry(default_model, default_features, previous=None):
+    """
+    Build the model registry around the default model.
+    
+    On a refresh, previous is the registry in use: unchanged versions keep
+    their stats and the caller closes it once the new one is swapped in.
+    """
+    if default_model is None or default_features is None:
+        return None
+    fingerprint = model_fingerprint(os.path.join(BASE_DIR, MODEL_FILE))
+    try:
+        registry = ModelRegistry(default_model, default_features,
+                                 default_fingerprint=fingerprint, previous=previous)
+    except RegistryError as e:
+        # Keep serving the default model if the routing config is wrong
+        print(f"✗ Model registry configuration error: {e}")
+        load_state['errors'].append(f'registry: {e}')
+        registry = ModelRegistry(default_model, default_features, traffic='', shadow='',
+                                 default_fingerprint=fingerprint, previous=previous)
+    print(f"✓ Model registry ready: {', '.join(registry.versions)}")
+    return registry
+
+
+def load_master_data():
+    """Load the processed master data CSV, returning None on failure."""
+    try:
+        df = pd.read_csv(os.path.join(BASE_DIR, 'processed_master_data.csv'))
+        # Clean up column names
+        df.columns = df.columns.str.strip()
+        print(f"✓ Master data loaded: {len(df)} records")
+        print(f"  States: {df['state'].nunique()}")
+        print(f"  Districts: {df['district'].nunique()}")
+        print(f"  Months: {df['month'].nunique()}")
+        return df
+    except Exception as e:
+        print(f"✗ Error loading master data CSV: {e}")
+        load_state['errors'].append(f'data: {e}')
+        return None
+
+
+def compute_scores(model, df):
+    """
+    Score every row of a master-data frame with one batched model.predict.
+    
+    Returns a DataFrame (same index as df) with ml_prediction, asi, aers,
+    mbu and rp from the shared scoring kernel.
+    """
+    return pd.DataFrame(scoring.score_frame(model, df), index=df.index)
+
+
+def build_location_index(df, model):
+    """
+    Sort master data by location and month, attach precomputed scores and
+    index the row positions of each (state, district).
+    """
+    ordered = df.sort_values(['state', 'district', 'month'], kind='stable').reset_index(drop=True)
+    if model is not None:
+        ordered = ordered.join(compute_scores(model, ordered).add_prefix('score_'))
+    index = ordered.groupby(['state', 'district'], sort=False).indices
+    return ordered, index
+
+
+def resource_version():
+    """
+    Fingerprint of the model, feature and data files and the registry folder.
+    
+    Changes whenever any of them is replaced, which is what triggers a refresh.
+    """
+    paths = [os.path.join(BASE_DIR, name) for name in WATCHED_FILES]
+    if os.path.isdir(REGISTRY_DIR):
+        for name in sorted(os.listdir(REGISTRY_DIR)):
+            paths.append(os.path.join(REGISTRY_DIR, name, MODEL_FILE))
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamps.append(f'{path}:{stat.st_mtime_ns}:{stat.st_size}')
+        except OSError:
+            stamps.append(f'{path}:missing')
+    return hashlib.sha1('|'.join(stamps).encode()).hexdigest()[:12]
+
+
+def build_resources(new_model, new_features, new_data, version, previous_registry=None):
+    """
+    Build the full resources bundle from freshly loaded files.
+    
+    Raises if a derived structure cannot be built; the new registry is
+    closed first so the caller can keep the previous bundle.
+    """
+    # Disabled if it was distilled from another model than the new one
+    fast_model = load_surrogate()
+    registry = load_model_registry(new_model, new_features, previous_registry)
+    scored, index, dataset, flagged, report = None, {}, None, None, None
+    try:
+        if new_data is not None:
+            scored, index = build_location_index(new_data, new_model)
+            print(f"✓ Location index built: {len(index)} districts")
+            dataset = DatasetIndex(new_data, version=version)
+            flagged = scan_anomalies(scored)
+            print(f"✓ Anomaly scan complete: {len(flagged)} rows flagged")
+            if new_model is not None:
+                report = run_backtest(new_model, new_data)
+                print(f"✓ Forecast backtest complete in {report.get('elapsed_seconds')}s")
+    except Exception:
+        if registry is not None:
+            registry.close()
+        raise
+    return Resources(new_model, new_features, new_data, fast_model, registry,
+                     scored, index, dataset, flagged, report, version)
+
+
+def load_resources(refresh=False):
+    """
+    Load the model and master data and publish them as `resources`.
+    
+    Runs at import time, or on a background thread when LAZY_LOAD is set.
+    The worker is ready only if the model and the data loaded and every
+    derived index was built.
+    
+    With refresh=True the worker stays ready: the new bundle is built while
+    requests keep using the current one, and only replaces it if the files
+    loaded and the indexes built. Subscribers of /events then get the scores
+    that changed.
+    """
+    global resources
+    
+    with _load_lock:
+        if not refresh:
+            load_state['status'] = 'loading'
+            load_state['started_at'] = datetime.now().isoformat()
+            load_state['finished_at'] = None
+        load_state['errors'] = []
+        version = resource_version()
+        
+        new_model, new_features = load_model_files()
+        new_data = load_master_data()
+        ready = new_model is not None and new_features is not None and new_data is not None
+        if refresh and not ready:
+            print("✗ Refresh failed, still serving the previous model and data")
+            # Do not retry the same broken files on every check
+            load_state['version'] = version
+            return False
+        
+        previous = resources
+        try:
+            bundle = build_resources(new_model, new_features, new_data, version,
+                                     previous.model_registry if refresh else None)
+        except Exception as e:
+            print(f"✗ Error building location index: {e}")
+            load_state['errors'].append(f'index: {e}')
+            load_state['version'] = version
+            if refresh:
+                print("✗ Refresh failed, still serving the previous model and data")
+                return False
+            # Report what did load; data routes stay unavailable
+            bundle = Resources(new_model, new_features, new_data, None, None,
+                               None, {}, None, None, None, version)
+            ready = False
+        
+        resources = bundle
+        if refresh:
+            if previous.model_registry is not None:
+                previous.model_registry.close()
+            batch_scoring.reset_pool()
+        if bundle.scored_df is not None and bundle.model is not None:
+            event = score_feed.update(bundle.scored_df, version)
+            if event is not None:
+                print(f"✓ Score update {event['id']} pushed: "
+                      f"{len(event['districts']['changed'])} district-months changed")
+        
+        load_state['version'] = version
+        load_state['status'] = 'ready' if ready else 'failed'
+        load_state['finished_at'] = datetime.now().isoformat()
+        return ready
+
+
+def watch_resources():
+    """Reload whenever the model, data or registry files change."""
+    while True:
+        time.sleep(REFRESH_INTERVAL)
+        if load_state['status'] != 'ready' or resource_version() == load_state['version']:
+            continue
+        print("  Model or data files changed, refreshing")
+        try:
+            load_resources(refresh=True)
+        except Exception as e:
+            print(f"✗ Refresh failed: {e}")
+
+
+def start_resources():
+    load_resources()
+    if REFRESH_INTERVAL > 0:
+        threading.Thread(target=watch_resources, name='resource-watcher', daemon=True).start()
+
+
+# Under `python app.py` the spawned batch-scoring workers re-import this
+# script as __mp_main__; they load their own model and must not load the
+# resources or start the watcher
+if __name__ == '__mp_main__':
+    pass
+elif LAZY_LOAD:
+    threading.Thread(target=start_resources, name='resource-loader', daemon=True).start()
+else:
+    start_resources()
+
+
+# Endpoints that must answer while the model and data are still loading
+ALWAYS_AVAILABLE_ENDPOINTS = {'health_check', 'readiness_check', 'admission_status', 'static'}
+
+
+def service_unavailable(message, retry_after=RETRY_AFTER_SECONDS, **extra):
+    """Build a 503 response with a Retry-After header."""
+    response = jsonify({'error': message, **extra})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+@app.before_request
+def reject_while_loading():
+    """Answer data routes with 503 + Retry-After until loading has finished."""
+    if request.method == 'OPTIONS' or request.endpoint in ALWAYS_AVAILABLE_ENDPOINTS:
+        return None
+    
+    if load_state['status'] in ('pending', 'loading'):
+        return service_unavailable(
+            'Model and data are still loading, retry shortly',
+            status=load_state['status']
+        )
+    return None
+
+
+# Per-endpoint concurrency limits, wait queues and body limits
 try:
-    master_df = pd.read_csv(os.path.join(BASE_DIR, 'processed_master_data.csv'))
-    # Clean up column names
-    master_df.columns = master_df.columns.str.strip()
-    print(f"✓ Master data loaded: {len(master_df)} records")
-    print(f"  States: {master_df['state'].nunique()}")
-    print(f"  Districts: {master_df['district'].nunique()}")
-    print(f"  Months: {master_df['month'].nunique()}")
-except Exception as e:
-    print(f"✗ Error loading master data CSV: {e}")
-    master_df = None
+    admission_overrides = admission.parse_overrides(os.environ.get('UIDAI_ADMISSION', ''))
+except ValueError as e:
+    print(f"✗ {e}; using default admission limits")
+    admission_overrides = {}
+admission_controller = admission.AdmissionController(overrides=admission_overrides)
+admission_controller.register(app)
+if admission_controller.thread_budget()['probe_threads'] < admission.PROBE_THREADS:
+    print(f"✗ Admission limits and {admission.MAX_SUBSCRIBERS} /events subscribers can hold "
+          f"every one of the {admission.WORKER_THREADS} worker threads; /health may stall")
+
+# Per-request profiling, only when UIDAI_PROFILE_TOKEN is configured
+register_profiling(app)
 
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint to verify server is running."""
+    """
+    Liveness probe: the process is up and serving requests.
+    
+    Always returns 200, even while loading or after a failed load, so the
+    platform does not restart workers that are still warming up. Use /ready
+    to find out whether the worker can serve data routes.
+    """
+    res = resources
     return jsonify({
         'status': 'healthy',
-        'model_loaded': model is not None,
-        'features_loaded': feature_names is not None,
-        'data_loaded': master_df is not None,
-        'expected_features': list(feature_names) if feature_names is not None else [],
-        'records_count': len(master_df) if master_df is not None else 0
+        'ready': load_state['status'] == 'ready',
+        'load_status': load_state['status'],
+        'model_loaded': res.model is not None,
+        'features_loaded': res.feature_names is not None,
+        'data_loaded': res.master_df is not None,
+        'expected_features': list(res.feature_names) if res.feature_names is not None else [],
+        'records_count': len(res.master_df) if res.master_df is not None else 0
     })
 
 
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness probe: the model and master data are loaded.
+    
+    Returns 200 when ready, 503 with Retry-After while loading, and 503
+    with the load errors if loading failed.
+    """
+    res = resources
+    body = {
+        'status': load_state['status'],
+        'model_loaded': res.model is not None,
+        'data_loaded': res.master_df is not None,
+        'started_at': load_state['started_at'],
+        'finished_at': load_state['finished_at'],
+        'version': load_state['version']
+    }
+    
+    if load_state['status'] == 'ready':
+        return jsonify(body)
+    
+    if load_state['status'] == 'failed':
+        body['errors'] = list(load_state['errors'])
+        return jsonify(body), 503
+    
+    return service_unavailable('Model and data are still loading', **body)
+
+
+@app.route('/admission', methods=['GET'])
+def admission_status():
+    """
+    Get this worker's admission control state: in-flight and queued requests,
+    shed counts per limiter, the configured limits, and the /events
+    subscribers holding threads.
+    """
+    return jsonify({**admission_controller.snapshot(), 'events': score_feed.describe()})
+
+
 @app.route('/metadata', methods=['GET'])
 def get_metadata():
     """
     Get unique values for dropdown menus.
     Returns states, districts, and months available in the dataset.
     """
-    if master_df is None:
+    res = resources
+    if res.master_df is None:
         return jsonify({'error': 'Master data not loaded'}), 500
     
     try:
         # Get unique states sorted alphabetically
-        states = sorted(master_df['state'].unique().tolist())
+        states = sorted(res.master_df['state'].unique().tolist())
         
         # Get unique months sorted chronologically
-        months = sorted(master_df['month'].unique().tolist())
+        months = sorted(res.master_df['month'].unique().tolist())
         
         # Get districts grouped by state
         districts_by_state = {}
         for state in states:
             state_districts = sorted(
-                master_df[master_df['state'] == state]['district'].unique().tolist()
+                res.master_df[res.master_df['state'] == state]['district'].unique().tolist()
             )
             districts_by_state[state] = state_districts
         
@@ -95,7 +477,8 @@ def get_districts():
     Get districts for a specific state.
     Query parameter: state
     """
-    if master_df is None:
+    res = resources
+    if res.master_df is None:
         return jsonify({'error': 'Master data not loaded'}), 500
     
     state = request.args.get('state', '')
@@ -105,7 +488,7 @@ def get_districts():
     
     try:
         districts = sorted(
-            master_df[master_df['state'] == state]['district'].unique().tolist()
+            res.master_df[res.master_df['state'] == state]['district'].unique().tolist()
         )
         return jsonify({'districts': districts})
     except Exception as e:
@@ -125,10 +508,11 @@ def get_history():
     Returns:
         List of records with month, asi, aers, mbu, and raw features
     """
-    if master_df is None:
+    res = resources
+    if res.master_df is None:
         return jsonify({'error': 'Master data not loaded'}), 500
     
-    if model is None:
+    if res.model is None:
         return jsonify({'error': 'Model not loaded'}), 500
     
     state = request.args.get('state', '')
@@ -139,8 +523,8 @@ def get_history():
     
     try:
         # Filter for the specific location
-        mask = (master_df['state'] == state) & (master_df['district'] == district)
-        filtered = master_df[mask].copy()
+        mask = (res.master_df['state'] == state) & (res.master_df['district'] == district)
+        filtered = res.master_df[mask].copy()
         
         if filtered.empty:
             return jsonify({
@@ -150,67 +534,27 @@ def get_history():
         # Sort by month chronologically
         filtered = filtered.sort_values('month')
         
-        # Get feature importances
-        if hasattr(model, 'feature_importances_'):
-            importances = model.feature_importances_
-            imp_e = importances[0] if len(importances) > 0 else 0.33
-            imp_d = importances[1] if len(importances) > 1 else 0.33
-            imp_c = importances[2] if len(importances) > 2 else 0.34
-        else:
-            imp_e, imp_d, imp_c = 0.34, 0.33, 0.33
-        
-        history = []
-        for _, row in filtered.iterrows():
-            # Extract features
-            d_e = float(row.get('d_e', 0))
-            d_d = float(row.get('d_d', 0))
-            d_c = float(row.get('d_c', 0))
-            d_b_lag1 = float(row.get('d_b_lag1', 0))
-            d_b_lag2 = float(row.get('d_b_lag2', 0))
-            d_c_lag1 = float(row.get('d_c_lag1', 0))
-            month_num = int(row.get('month_num', 1))
-            
-            b = float(row.get('B', row.get('b', 100)))
-            c = float(row.get('C', row.get('c', 25)))
-            d = float(row.get('D', row.get('d', 50)))
-            
-            # Get ML prediction
-            features = np.array([[d_e, d_d, d_c, d_b_lag1, d_b_lag2, d_c_lag1, month_num]])
-            ml_prediction = model.predict(features)[0]
-            
-            # Physics-based calculations (from walkthrough)
-            # ASI = (1.0 * ML_Prediction) + (imp_c * d_c) + (imp_d * d_d) + (imp_e * d_e)
-            asi_raw = (1.0 * ml_prediction) + (imp_c * d_c) + (imp_d * d_d) + (imp_e * d_e)
-            
-            # MBU = c / (b + d + 1e-6) with safety factor
-            mbu = c / (b + d + 1e-6)
-            
-            # RP = (b - c) / (b + 1e-6) with safety factor
-            rp = (b - c) / (b + 1e-6)
-            
-            # AERS = ASI * (MBU + RP)
-            aers_raw = asi_raw * (mbu + rp)
-            
-            # Normalize ASI to 0-100 scale
-            asi_normalized = min(max(abs(ml_prediction) * 100 + 50, 0), 100)
-            
-            # Normalize AERS to 0-1 scale
-            aers_normalized = min(max(abs(aers_raw), 0), 1)
-            
-            history.append({
-                'month': row['month'],
-                'asi': round(asi_normalized, 2),
-                'aers': round(aers_normalized, 4),
-                'mbu': round(mbu, 4),
-                'rp': round(rp, 4),
-                'ml_prediction': round(ml_prediction, 6),
-                'd_e': round(d_e, 6),
-                'd_d': round(d_d, 6),
-                'd_c': round(d_c, 6),
-                'b': round(b, 2),
-                'c': round(c, 2),
-                'd': round(d, 2)
-            })
+        # Score all months with one batched predict
+        scores = scoring.score_frame(res.model, filtered)
+        b, c, d = scoring.load_columns(filtered)
+        columns = {
+            'asi': scoring.rounded(scores['asi'], 2),
+            'aers': scoring.rounded(scores['aers'], 4),
+            'mbu': scoring.rounded(scores['mbu'], 4),
+            'rp': scoring.rounded(scores['rp'], 4),
+            'ml_prediction': scoring.rounded(scores['ml_prediction'], 6),
+            'd_e': scoring.rounded(filtered['d_e'], 6),
+            'd_d': scoring.rounded(filtered['d_d'], 6),
+            'd_c': scoring.rounded(filtered['d_c'], 6),
+            'b': scoring.rounded(b, 2),
+            'c': scoring.rounded(c, 2),
+            'd': scoring.rounded(d, 2)
+        }
+        
+        history = [
+            {'month': month, **{key: values[i] for key, values in columns.items()}}
+            for i, month in enumerate(filtered['month'].tolist())
+        ]
         
         return jsonify({
             'state': state,
@@ -225,6 +569,239 @@ def get_history():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/history/bulk', methods=['POST'])
+def get_history_bulk():
+    """
+    Get historical time-series data for several districts in one request.
+    
+    Expected JSON input (either or both):
+    {
+        "locations": [{"state": string, "district": string}, ...],
+        "state": string    # Include every district of this state
+    }
+    
+    Returns one series per district, each shaped like the /history response,
+    plus the requested locations that were not found.
+    """
+    res = resources
+    if res.master_df is None or res.scored_df is None:
+        return jsonify({'error': 'Master data not loaded'}), 500
+    
+    if res.model is None:
+        return jsonify({'error': 'Model not loaded'}), 500
+    
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    
+    locations = data.get('locations', [])
+    whole_state = data.get('state', '')
+    
+    if not isinstance(locations, list):
+        return jsonify({'error': 'locations must be a list of {state, district} objects'}), 400
+    
+    if not isinstance(whole_state, str):
+        return jsonify({'error': 'state must be a string'}), 400
+    
+    if len(locations) > admission.MAX_BULK_LOCATIONS:
+        return jsonify({
+            'error': f'At most {admission.MAX_BULK_LOCATIONS} locations per request'
+        }), 413
+    
+    if not locations and not whole_state:
+        return jsonify({'error': 'Provide a list of locations or a state'}), 400
+    
+    try:
+        keys = []
+        missing = []
+        for loc in locations:
+            if not isinstance(loc, dict) or not loc.get('state') or not loc.get('district'):
+                return jsonify({'error': 'Each location needs both state and district'}), 400
+            if not isinstance(loc['state'], str) or not isinstance(loc['district'], str):
+                return jsonify({'error': 'state and district must be strings'}), 400
+            key = (loc['state'], loc['district'])
+            if key in res.location_index:
+                keys.append(key)
+            else:
+                missing.append({'state': key[0], 'district': key[1]})
+        
+        if whole_state:
+            state_keys = [key for key in res.location_index if key[0] == whole_state]
+            if not state_keys:
+                missing.append({'state': whole_state, 'district': None})
+            keys.extend(state_keys)
+        
+        # Drop duplicates while keeping request order
+        keys = list(dict.fromkeys(keys))
+        
+        if not keys:
+            return jsonify({'error': 'No data found for the requested locations', 'missing': missing}), 404
+        
+        # Gather every requested row with a single positional take
+        positions = [res.location_index[key] for key in keys]
+        rows = res.scored_df.take(np.concatenate(positions))
+        
+        if 'score_asi' in rows.columns:
+            scores = rows[['score_ml_prediction', 'score_asi', 'score_aers', 'score_mbu', 'score_rp']]
+            scores.columns = ['ml_prediction', 'asi', 'aers', 'mbu', 'rp']
+        else:
+            scores = compute_scores(res.model, rows)
+        
+        b, c, d = scoring.load_columns(rows)
+        table = pd.DataFrame({
+            'month': rows['month'].to_numpy(),
+            'asi': scoring.rounded(scores['asi'], 2),
+            'aers': scoring.rounded(scores['aers'], 4),
+            'mbu': scoring.rounded(scores['mbu'], 4),
+            'rp': scoring.rounded(scores['rp'], 4),
+            'ml_prediction': scoring.rounded(scores['ml_prediction'], 6),
+            'd_e': scoring.rounded(rows['d_e'], 6),
+            'd_d': scoring.rounded(rows['d_d'], 6),
+            'd_c': scoring.rounded(rows['d_c'], 6),
+            'b': scoring.rounded(b, 2),
+            'c': scoring.rounded(c, 2),
+            'd': scoring.rounded(d, 2)
+        })
+        records = table.to_dict('records')
+        
+        series = []
+        start = 0
+        for key, pos in zip(keys, positions):
+            end = start + len(pos)
+            series.append({
+                'state': key[0],
+                'district': key[1],
+                'records_count': len(pos),
+                'history': records[start:end]
+            })
+            start = end
+        
+        return jsonify({
+            'districts_count': len(series),
+            'records_count': len(records),
+            'series': series,
+            'missing': missing
+        })
+        
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/dataset', methods=['GET'])
+def query_dataset():
+    """
+    Browse rows of the processed master data one page at a time.
+    
+    Query parameters:
+        columns: comma-separated columns to return (default: all)
+        state, district: exact location match (district requires state)
+        month_from, month_to: inclusive month range, e.g. "2025-07"
+        where: numeric filter such as "AERS_current>0.5" (repeatable)
+        sort: column to sort by
+        order: "asc" (default) or "desc"
+        limit: page size (default 100, max 1000)
+        cursor: next_cursor from the previous page
+    
+    Returns:
+        columns, rows and next_cursor (null on the last page)
+    """
+    res = resources
+    if res.master_df is None or res.dataset_index is None:
+        return jsonify({'error': 'Master data not loaded'}), 500
+    
+    columns = request.args.get('columns', '')
+    
+    try:
+        page = res.dataset_index.query(
+            columns=[col.strip() for col in columns.split(',') if col.strip()],
+            state=request.args.get('state') or None,
+            district=request.args.get('district') or None,
+            month_from=request.args.get('month_from') or None,
+            month_to=request.args.get('month_to') or None,
+            filters=request.args.getlist('where'),
+            sort=request.args.get('sort') or None,
+            order=request.args.get('order', 'asc'),
+            limit=request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+            cursor=request.args.get('cursor') or None
+        )
+        page['total_rows'] = res.dataset_index.n_rows
+        return jsonify(page)
+    except DatasetQueryError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/anomalies', methods=['GET'])
+def get_anomalies():
+    """
+    Get district-months whose metrics break from the district's recent history.
+    
+    The scan runs when data is loaded; this endpoint only filters its result.
+    
+    Query parameters:
+        state, district, month: optional filters
+        metric: only rows driven by this metric (d_b, d_e, d_c, mbu, asi)
+        min_severity: minimum |z-score| (default and lower bound: scan threshold)
+        limit: maximum rows to return (default 100)
+    
+    Returns flagged rows ranked by severity, highest first.
+    """
+    res = resources
+    if res.anomaly_table is None:
+        return jsonify({'error': 'Master data not loaded'}), 500
+    
+    try:
+        min_severity = request.args.get('min_severity', DEFAULT_THRESHOLD, type=float)
+        if not np.isfinite(min_severity):
+            return jsonify({'error': 'min_severity must be a finite number'}), 400
+        min_severity = max(min_severity, DEFAULT_THRESHOLD)
+        limit = request.args.get('limit', 100, type=int)
+        
+        flagged = res.anomaly_table
+        mask = flagged['severity'] >= min_severity
+        for param in ('state', 'district', 'month'):
+            value = request.args.get(param, '')
+            if value:
+                mask &= flagged[param] == value
+        metric = request.args.get('metric', '')
+        if metric:
+            mask &= flagged['driver'] == metric
+        flagged = flagged[mask]
+        
+        metric_names = [col[2:] for col in flagged.columns if col.startswith('z_')]
+        anomalies = []
+        for row in flagged.head(max(limit, 0)).itertuples(index=False):
+            row = row._asdict()
+            anomalies.append({
+                'state': row['state'],
+                'district': row['district'],
+                'month': row['month'],
+                'severity': round(float(row['severity']), 3),
+                'driver': row['driver'],
+                'values': {m: round(float(row[m]), 6) for m in metric_names},
+                'z_scores': {
+                    m: (None if pd.isna(row['z_' + m]) else round(float(row['z_' + m]), 3))
+                    for m in metric_names
+                }
+            })
+        
+        return jsonify({
+            'window': DEFAULT_WINDOW,
+            'threshold': min_severity,
+            'flagged_count': int(len(flagged)),
+            'anomalies': anomalies
+        })
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """
@@ -245,6 +822,13 @@ def predict():
         ...
     }
     
+    Either format accepts "mode": "fast" (or ?mode=fast) to score with the
+    distilled surrogate instead of the full ensemble. Fast results are
+    approximate and meant for interactive exploration.
+    
+    In full mode "model_version" (or ?model_version=) picks a registry
+    version; without it the configured traffic split decides.
+    
     Returns:
     {
         "asi": float,
@@ -253,7 +837,8 @@ def predict():
         ...
     }
     """
-    if model is None or feature_names is None:
+    res = resources
+    if res.model is None or res.feature_names is None:
         return jsonify({
             'error': 'Model not loaded. Please check server logs.'
         }), 500
@@ -261,11 +846,31 @@ def predict():
     try:
         data = request.get_json()
         
-        # Check if this is a CSV lookup request
-        if 'state' in data and 'district' in data and 'month' in data:
-            return predict_from_csv(data)
+        mode = data.get('mode') or request.args.get('mode', 'full')
+        if mode not in ('full', 'fast'):
+            return jsonify({'error': 'mode must be "full" or "fast"'}), 400
+        
+        if mode == 'fast':
+            if res.surrogate is None:
+                return jsonify({'error': 'Fast mode unavailable: surrogate model not loaded'}), 503
+            predictor = res.surrogate
         else:
-            return predict_from_manual(data)
+            try:
+                predictor = choose_model_version(
+                res, data.get('model_version') or request.args.get('model_version')
+                )
+            except RegistryError as e:
+                return jsonify({'error': str(e)}), 400
+        
+        # CSV lookup or manual input, scored through the shared kernel
+        body, status = score_scenarios(res, [data], predictor)[0]
+        if status != 200:
+            return jsonify(body), status
+        if mode == 'fast':
+            body['mode'] = 'fast'
+        else:
+            body['model_version'] = getattr(predictor, 'name', 'default')
+        return jsonify(body)
             
     except Exception as e:
         import traceback
@@ -273,217 +878,100 @@ def predict():
         return jsonify({'error': str(e)}), 400
 
 
-def predict_from_csv(data):
-    """Handle prediction from CSV lookup."""
-    if master_df is None:
-        return jsonify({'error': 'Master data not loaded'}), 500
+def choose_model_version(res, requested=None):
+    """Pick the registry version for a request (plain model if no registry)."""
+    if res.model_registry is None:
+        if requested:
+            raise RegistryError('Model registry not loaded')
+        return res.model
+    return res.model_registry.choose(requested)
+
+
+def location_columns(frame):
+    """Month, feature and b/c/d arrays of scored_df, as read by locate_scenario."""
+    columns = {'month': frame['month'].to_numpy()}
+    for name in ('d_e', 'd_d', 'd_c', 'd_b_lag1', 'd_b_lag2', 'd_c_lag1'):
+        columns[name] = frame[name].to_numpy(dtype=float)
+    columns['b'], columns['c'], columns['d'] = scoring.load_columns(frame)
+    return columns
+
+
+def locate_scenario(data, columns, index):
+    """
+    Resolve a state/district/month scenario against the location index.
+    
+    columns come from location_columns(scored_df). Returns ('row', position)
+    for a month in the data, with position the row of scored_df;
+    ('projected', inputs) for a later month, with the trend-extrapolated
+    inputs; or ('error', (message, status)).
+    """
+    if columns is None:
+        return 'error', ('Master data not loaded', 500)
     
     state = data.get('state', '')
     district = data.get('district', '')
     month = data.get('month', '')
     
-    # Filter the DataFrame for matching records
-    mask = (
-        (master_df['state'] == state) & 
-        (master_df['district'] == district) & 
-        (master_df['month'] == month)
-    )
+    positions = index.get((state, district))
+    if positions is None:
+        return 'error', (f'No data found for district "{district}" in state "{state}"', 404)
     
-    filtered = master_df[mask]
+    # The index keeps each district's rows sorted by month
+    months = columns['month'][positions]
+    matches = positions[months == month]
+    if len(matches):
+        return 'row', int(matches[0])
     
-    if filtered.empty:
-        # Check if district exists but month doesn't
-        district_mask = (master_df['state'] == state) & (master_df['district'] == district)
-        district_data = master_df[district_mask].sort_values('month')
-        
-        if district_data.empty:
-            return jsonify({
-                'error': f'No data found for district "{district}" in state "{state}"'
-            }), 404
-        
-        # For 2026-01 or future months, generate prediction using trend extrapolation
-        if month >= '2026-01':
-            # Get historical data (≤2025-12)
-            historical = district_data[district_data['month'] <= '2025-12']
-            
-            if len(historical) < 2:
-                return jsonify({'error': 'Insufficient historical data for trend projection'}), 404
-            
-            # Calculate trends from last 3 records
-            n_trend = min(3, len(historical))
-            trend_data = historical.tail(n_trend)
-            
-            d_e_trend = (trend_data['d_e'].iloc[-1] - trend_data['d_e'].iloc[0]) / max(n_trend - 1, 1)
-            d_d_trend = (trend_data['d_d'].iloc[-1] - trend_data['d_d'].iloc[0]) / max(n_trend - 1, 1)
-            d_c_trend = (trend_data['d_c'].iloc[-1] - trend_data['d_c'].iloc[0]) / max(n_trend - 1, 1)
-            
-            # B/C/D trends
-            b_col = 'B' if 'B' in trend_data.columns else 'b'
-            c_col = 'C' if 'C' in trend_data.columns else 'c'
-            d_col = 'D' if 'D' in trend_data.columns else 'd'
-            
-            b_trend = (float(trend_data[b_col].iloc[-1]) - float(trend_data[b_col].iloc[0])) / max(n_trend - 1, 1)
-            c_trend = (float(trend_data[c_col].iloc[-1]) - float(trend_data[c_col].iloc[0])) / max(n_trend - 1, 1)
-            d_trend_val = (float(trend_data[d_col].iloc[-1]) - float(trend_data[d_col].iloc[0])) / max(n_trend - 1, 1)
-            
-            # Calculate months ahead from last historical
-            last_hist = historical.iloc[-1]
-            last_month = last_hist['month']
-            # Simple month difference (assuming format YYYY-MM)
-            ly, lm = int(last_month[:4]), int(last_month[5:7])
-            ty, tm = int(month[:4]), int(month[5:7])
-            months_ahead = (ty - ly) * 12 + (tm - lm)
-            
-            # Extrapolate features
-            d_e = float(last_hist.get('d_e', 0)) + d_e_trend * months_ahead
-            d_d = float(last_hist.get('d_d', 0)) + d_d_trend * months_ahead
-            d_c = float(last_hist.get('d_c', 0)) + d_c_trend * months_ahead
-            d_b_lag1 = float(last_hist.get('d_b_lag1', 0))
-            d_b_lag2 = float(last_hist.get('d_b_lag2', 0))
-            d_c_lag1 = float(last_hist.get('d_c_lag1', 0))
-            month_num = tm
-            
-            b = max(float(last_hist.get(b_col, 100)) + b_trend * months_ahead, 1)
-            c = max(float(last_hist.get(c_col, 25)) + c_trend * months_ahead, 0)
-            d = max(float(last_hist.get(d_col, 50)) + d_trend_val * months_ahead, 1)
-            
-            # Calculate prediction
-            features = np.array([[d_e, d_d, d_c, d_b_lag1, d_b_lag2, d_c_lag1, month_num]])
-            ml_prediction = model.predict(features)[0]
-            
-            if hasattr(model, 'feature_importances_'):
-                importances = model.feature_importances_
-                imp_e = importances[0] if len(importances) > 0 else 0.33
-                imp_d = importances[1] if len(importances) > 1 else 0.33
-                imp_c = importances[2] if len(importances) > 2 else 0.34
-            else:
-                imp_e, imp_d, imp_c = 0.34, 0.33, 0.33
-            
-            asi_raw = (1.0 * ml_prediction) + (imp_c * d_c) + (imp_d * d_d) + (imp_e * d_e)
-            mbu = c / (b + d + 1e-6)
-            rp = (b - c) / (b + 1e-6)
-            aers_raw = asi_raw * (mbu + rp)
-            
-            asi_normalized = min(max(abs(ml_prediction) * 100 + 50, 0), 100)
-            aers_normalized = min(max(abs(aers_raw), 0), 1)
-            
-            return jsonify({
-                'asi': round(asi_normalized, 2),
-                'aers': round(aers_normalized, 4),
-                'mbu': round(mbu, 4),
-                'rp': round(rp, 4),
-                'ml_prediction': round(ml_prediction, 6),
-                'is_projected': True,
-                'extracted_features': {
-                    'd_e': round(d_e, 6),
-                    'd_d': round(d_d, 6),
-                    'd_c': round(d_c, 6),
-                    'd_b_lag1': round(d_b_lag1, 6),
-                    'd_b_lag2': round(d_b_lag2, 6),
-                    'd_c_lag1': round(d_c_lag1, 6),
-                    'month_num': month_num,
-                    'b': round(b, 2),
-                    'c': round(c, 2),
-                    'd': round(d, 2)
-                },
-                'location': {
-                    'state': state,
-                    'district': district,
-                    'month': month
-                }
-            })
-        else:
-            available_months = sorted(district_data['month'].unique().tolist())
-            return jsonify({
-                'error': f'No historical data for period "{month}". Available months: {", ".join(available_months[-5:])}'
-            }), 404
+    # For 2026-01 or future months, generate prediction using trend extrapolation
+    if month < '2026-01':
+        available_months = sorted(set(months.tolist()))
+        return 'error', (
+            f'No historical data for period "{month}". Available months: {", ".join(available_months[-5:])}',
+            404
+        )
     
-    # Get the first matching record (for actual historical data)
-    record = filtered.iloc[0]
-    
-    # Extract features from CSV
-    d_e = float(record.get('d_e', 0))
-    d_d = float(record.get('d_d', 0))
-    d_c = float(record.get('d_c', 0))
-    d_b_lag1 = float(record.get('d_b_lag1', 0))
-    d_b_lag2 = float(record.get('d_b_lag2', 0))
-    d_c_lag1 = float(record.get('d_c_lag1', 0))
-    month_num = int(record.get('month_num', datetime.now().month))
-    
-    # Extract load values for physics-based calculations  
-    # Use the CSV column names: B (adult biometric), C (child), D (demographic)
-    b = float(record.get('B', record.get('b', 100)))  # Biometric load
-    c = float(record.get('C', record.get('c', 25)))   # Child load
-    d = float(record.get('D', record.get('d', 50)))   # Demographic load
-    
-    # Prepare features for the model
-    features = np.array([[d_e, d_d, d_c, d_b_lag1, d_b_lag2, d_c_lag1, month_num]])
-    
-    # Get ML prediction
-    ml_prediction = model.predict(features)[0]
-    
-    # Get feature importances
-    if hasattr(model, 'feature_importances_'):
-        importances = model.feature_importances_
-        imp_e = importances[0] if len(importances) > 0 else 0.33
-        imp_d = importances[1] if len(importances) > 1 else 0.33
-        imp_c = importances[2] if len(importances) > 2 else 0.34
-    else:
-        imp_e, imp_d, imp_c = 0.34, 0.33, 0.33
+    # Get historical data (≤2025-12)
+    historical = positions[months <= '2025-12']
     
-    # Calculate Physics-based indices from walkthrough.md formulas
-    # ASI = (1.0 * ML_Prediction) + (imp_c * d_c) + (imp_d * d_d) + (imp_e * d_e)
-    asi = (1.0 * ml_prediction) + (imp_c * d_c) + (imp_d * d_d) + (imp_e * d_e)
+    if len(historical) < 2:
+        return 'error', ('Insufficient historical data for trend projection', 404)
     
-    # MBU = c / (b + d + 1e-6) with safety factor
-    mbu = c / (b + d + 1e-6)
+    # Calculate trends from last 3 records
+    n_trend = min(3, len(historical))
+    trend_rows = historical[-n_trend:]
     
-    # RP = (b - c) / (b + 1e-6) with safety factor
-    rp = (b - c) / (b + 1e-6)
+    # Per-column trend and last historical value (b/c/d from B/C/D)
+    last, trend = {}, {}
+    for name in ('d_e', 'd_d', 'd_c', 'd_b_lag1', 'd_b_lag2', 'd_c_lag1', 'b', 'c', 'd'):
+        values = columns[name][trend_rows]
+        last[name] = float(values[-1])
+        trend[name] = (values[-1] - values[0]) / max(n_trend - 1, 1)
     
-    # AERS = ASI * (MBU + RP)
-    aers = asi * (mbu + rp)
+    # Calculate months ahead from last historical
+    last_month = months[len(historical) - 1]
+    # Simple month difference (assuming format YYYY-MM)
+    ly, lm = int(last_month[:4]), int(last_month[5:7])
+    ty, tm = int(month[:4]), int(month[5:7])
+    months_ahead = (ty - ly) * 12 + (tm - lm)
     
-    # Normalize ASI to 0-100 scale
-    asi_normalized = min(max(abs(ml_prediction) * 100 + 50, 0), 100)
+    # Extrapolate features
+    d_e = last['d_e'] + trend['d_e'] * months_ahead
+    d_d = last['d_d'] + trend['d_d'] * months_ahead
+    d_c = last['d_c'] + trend['d_c'] * months_ahead
+    d_b_lag1 = last['d_b_lag1']
+    d_b_lag2 = last['d_b_lag2']
+    d_c_lag1 = last['d_c_lag1']
+    month_num = tm
     
-    # Normalize AERS to 0-1 scale
-    aers_normalized = min(max(abs(aers), 0), 1)
+    b = max(last['b'] + trend['b'] * months_ahead, 1)
+    c = max(last['c'] + trend['c'] * months_ahead, 0)
+    d = max(last['d'] + trend['d'] * months_ahead, 1)
     
-    return jsonify({
-        'asi': round(asi_normalized, 2),
-        'aers': round(aers_normalized, 4),
-        'mbu': round(mbu, 4),
-        'rp': round(rp, 4),
-        'ml_prediction': round(ml_prediction, 6),
-        'feature_importances': {
-            'imp_e': round(imp_e, 4),
-            'imp_d': round(imp_d, 4),
-            'imp_c': round(imp_c, 4)
-        },
-        # Return the extracted features for transparency
-        'extracted_features': {
-            'd_e': round(d_e, 6),
-            'd_d': round(d_d, 6),
-            'd_c': round(d_c, 6),
-            'd_b_lag1': round(d_b_lag1, 6),
-            'd_b_lag2': round(d_b_lag2, 6),
-            'd_c_lag1': round(d_c_lag1, 6),
-            'month_num': month_num,
-            'b': round(b, 2),
-            'c': round(c, 2),
-            'd': round(d, 2)
-        },
-        'location': {
-            'state': state,
-            'district': district,
-            'month': month
-        }
-    })
+    return 'projected', ([d_e, d_d, d_c, d_b_lag1, d_b_lag2, d_c_lag1, month_num], (b, c, d))
 
 
-def predict_from_manual(data):
-    """Handle prediction from manual input (original behavior)."""
+def manual_inputs(data):
+    """Model features and (b, c, d) loads of a manual scenario, with the /predict defaults."""
     # Extract main delta drivers
     d_e = float(data.get('d_e', 0))
     d_d = float(data.get('d_d', 0))
@@ -502,62 +990,138 @@ def predict_from_manual(data):
     c = float(data.get('c', 25))
     d = float(data.get('d', 50))
     
-    # Prepare features
-    features = np.array([[d_e, d_d, d_c, d_b_lag1, d_b_lag2, d_c_lag1, month_num]])
+    return [d_e, d_d, d_c, d_b_lag1, d_b_lag2, d_c_lag1, month_num], (b, c, d)
+
+
+def score_scenarios(res, scenarios, predictor=None):
+    """
+    Score /predict scenarios with a single predict call.
     
-    # Get ML prediction
-    ml_prediction = model.predict(features)[0]
+    Each scenario is a CSV lookup (state, district and month) or manual
+    input. Rows found in the data are gathered from scored_df in one take,
+    manual and projected scenarios are built one by one, and the whole
+    feature matrix goes through the scoring kernel (and the shadow model)
+    once. Returns (body, status) per scenario, in input order.
+    """
+    predictor = predictor if predictor is not None else res.model
+    # Importances follow the serving version; the surrogate has none of its own
+    importance_model = predictor if hasattr(predictor, 'feature_importances_') else res.model
+    imp_e, imp_d, imp_c = scoring.get_importances(importance_model)
+    frame, index = res.scored_df, res.location_index
+    columns = None
     
-    # Get feature importances
-    if hasattr(model, 'feature_importances_'):
-        importances = model.feature_importances_
-        imp_e, imp_d, imp_c = importances[0], importances[1], importances[2]
-    else:
-        imp_e, imp_d, imp_c = 0.34, 0.33, 0.33
+    resolved = []
+    for scenario in scenarios:
+        if 'state' in scenario and 'district' in scenario and 'month' in scenario:
+            if columns is None and frame is not None:
+                columns = location_columns(frame)
+            resolved.append(locate_scenario(scenario, columns, index))
+        else:
+            resolved.append(('manual', manual_inputs(scenario)))
     
-    # Calculate indices
-    asi = (1.0 * ml_prediction) + (imp_c * d_c) + (imp_d * d_d) + (imp_e * d_e)
-    mbu = c / (b + d + 1e-6)
-    rp = (b - c) / (b + 1e-6)
-    aers = asi * (mbu + rp)
+    # One matrix row per scored scenario
+    slots = {}
+    for i, (kind, _) in enumerate(resolved):
+        if kind != 'error':
+            slots[i] = len(slots)
+    features = np.empty((len(slots), len(scoring.FEATURE_COLUMNS)))
+    loads = np.empty((len(slots), 3))
+    found = {}
+    for i, (kind, value) in enumerate(resolved):
+        if kind == 'row':
+            found[slots[i]] = value
+        elif kind != 'error':
+            features[slots[i]], loads[slots[i]] = value
+    if found:
+        rows = frame.iloc[list(found.values())]
+        features[list(found)] = rows[scoring.FEATURE_COLUMNS].to_numpy(dtype=float)
+        loads[list(found)] = np.column_stack(scoring.load_columns(rows))
     
-    asi_normalized = min(max(abs(ml_prediction) * 100 + 50, 0), 100)
-    aers_normalized = min(max(abs(aers), 0), 1)
+    scores = {}
+    if slots:
+        scores = scoring.rounded_scores(scoring.score(
+            predictor, features, loads[:, 0], loads[:, 1], loads[:, 2], (imp_e, imp_d, imp_c)
+        ))
+    feature_rows, load_rows = features.tolist(), loads.tolist()
     
-    return jsonify({
-        'asi': round(asi_normalized, 2),
-        'aers': round(aers_normalized, 4),
-        'mbu': round(mbu, 4),
-        'rp': round(rp, 4),
-        'ml_prediction': round(ml_prediction, 6),
-        'feature_importances': {
-            'imp_e': round(imp_e, 4),
-            'imp_d': round(imp_d, 4),
-            'imp_c': round(imp_c, 4)
-        }
-    })
+    results = []
+    for i, (scenario, (kind, value)) in enumerate(zip(scenarios, resolved)):
+        if kind == 'error':
+            message, status = value
+            results.append(({'error': message}, status))
+            continue
+        slot = slots[i]
+        body = {key: values[slot] for key, values in scores.items()}
+        if kind != 'projected':
+            body['feature_importances'] = {
+                'imp_e': round(float(imp_e), 4),
+                'imp_d': round(float(imp_d), 4),
+                'imp_c': round(float(imp_c), 4)
+            }
+        if kind != 'manual':
+            d_e, d_d, d_c, d_b_lag1, d_b_lag2, d_c_lag1, month_num = feature_rows[slot]
+            b, c, d = load_rows[slot]
+            if kind == 'projected':
+                body['is_projected'] = True
+            # Return the extracted features for transparency
+            body['extracted_features'] = {
+                'd_e': round(d_e, 6),
+                'd_d': round(d_d, 6),
+                'd_c': round(d_c, 6),
+                'd_b_lag1': round(d_b_lag1, 6),
+                'd_b_lag2': round(d_b_lag2, 6),
+                'd_c_lag1': round(d_c_lag1, 6),
+                'month_num': int(month_num),
+                'b': round(b, 2),
+                'c': round(c, 2),
+                'd': round(d, 2)
+            }
+            body['location'] = {
+                'state': scenario.get('state', ''),
+                'district': scenario.get('district', ''),
+                'month': scenario.get('month', '')
+            }
+        results.append((body, 200))
+    return results
 
 
 @app.route('/batch-predict', methods=['POST'])
 def batch_predict():
-    """Batch prediction for multiple scenarios."""
-    if model is None:
+    """
+    Batch prediction for multiple scenarios.
+    
+    Scenarios take the /predict formats (CSV lookup or manual input) and are
+    scored together with one model call. A lookup that /predict would answer
+    with 404 gets {"error": ...} in its place instead of failing the batch.
+    """
+    res = resources
+    if res.model is None:
         return jsonify({'error': 'Model not loaded'}), 500
     
     try:
         data = request.get_json()
         scenarios = data.get('scenarios', [])
         
-        results = []
-        for scenario in scenarios:
-            if 'state' in scenario and 'district' in scenario and 'month' in scenario:
-                # CSV lookup
-                result = predict_from_csv(scenario)
-            else:
-                result = predict_from_manual(scenario)
-            results.append(result.get_json())
+        if len(scenarios) > admission.MAX_BATCH_SCENARIOS:
+            return jsonify({
+                'error': f'At most {admission.MAX_BATCH_SCENARIOS} scenarios per request; '
+                         'use /batch-predict/stream for larger batches'
+            }), 413
+        
+        try:
+            predictor = choose_model_version(
+                res, data.get('model_version') or request.args.get('model_version')
+            )
+        except RegistryError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # One predict call for the whole batch; unknown locations get an error entry
+        results = [body for body, _ in score_scenarios(res, scenarios, predictor)]
         
-        return jsonify({'predictions': results})
+        return jsonify({
+            'predictions': results,
+            'model_version': getattr(predictor, 'name', 'default')
+        })
         
     except Exception as e:
         import traceback
@@ -565,30 +1129,101 @@ def batch_predict():
         return jsonify({'error': str(e)}), 400
 
 
+@app.route('/batch-predict/stream', methods=['POST'])
+def batch_predict_stream():
+    """
+    Large-batch scoring of manual scenarios across a process pool.
+    
+    Accepts an NDJSON body (application/x-ndjson), a CSV body (text/csv) or a
+    multipart upload in a "file" field (.csv, .ndjson or .jsonl). Each row uses
+    the manual /predict fields (d_e, d_d, d_c, d_b_lag1, d_b_lag2, d_c_lag1,
+    month_num, b, c, d) with the same defaults.
+    
+    Returns an NDJSON stream in input order: one {"index", "asi", "aers",
+    "mbu", "rp", "ml_prediction"} line per row (or {"index", "error"}), a
+    {"progress": ...} line after every chunk and a final {"done": ...} line.
+    """
+    res = resources
+    if res.model is None:
+        return jsonify({'error': 'Model not loaded'}), 500
+    
+    upload = request.files.get('file')
+    if upload is not None:
+        name = (upload.filename or '').lower()
+        fmt = 'csv' if name.endswith('.csv') else 'ndjson'
+        # Flask closes uploaded files when the view returns, before the
+        # streamed response is read, so stream from a duplicate handle
+        upload.stream.seek(0)
+        stream = os.fdopen(os.dup(upload.stream.fileno()), 'rb')
+    else:
+        content_type = request.mimetype or ''
+        if content_type in ('text/csv', 'application/csv'):
+            fmt = 'csv'
+        elif content_type in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+            fmt = 'ndjson'
+        else:
+            return jsonify({
+                'error': 'Send NDJSON (application/x-ndjson), CSV (text/csv) or a multipart "file" upload'
+            }), 415
+        stream = request.stream
+    
+    records = batch_scoring.iter_records(stream, fmt)
+    lines = batch_scoring.stream_scores(records, default_month=datetime.now().month)
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+
+atexit.register(batch_scoring.shutdown_pool)
+
+
 @app.route('/model-info', methods=['GET'])
 def model_info():
     """Get information about the loaded model."""
-    if model is None:
+    res = resources
+    if res.model is None:
         return jsonify({'error': 'Model not loaded'}), 500
     
     info = {
-        'model_type': str(type(model).__name__),
-        'n_features': model.n_features_in_ if hasattr(model, 'n_features_in_') else None,
-        'feature_names': list(feature_names) if feature_names is not None else [],
+        'model_type': str(type(res.model).__name__),
+        'n_features': res.model.n_features_in_ if hasattr(res.model, 'n_features_in_') else None,
+        'feature_names': list(res.feature_names) if res.feature_names is not None else [],
     }
     
-    if hasattr(model, 'feature_importances_'):
+    if hasattr(res.model, 'feature_importances_'):
         info['feature_importances'] = {
             name: round(float(imp), 4) 
-            for name, imp in zip(feature_names, model.feature_importances_)
+            for name, imp in zip(res.feature_names, res.model.feature_importances_)
         }
     
-    if hasattr(model, 'n_estimators'):
-        info['n_estimators'] = model.n_estimators
+    if hasattr(res.model, 'n_estimators'):
+        info['n_estimators'] = res.model.n_estimators
+    
+    if res.surrogate is not None:
+        report = res.surrogate.report
+        info['surrogate'] = {
+            'trained_at': res.surrogate.trained_at,
+            'max_depth': res.surrogate.depth,
+            'leaves': report.get('leaves'),
+            'mae': report.get('mae'),
+            'asi_mae': report.get('asi_mae'),
+            'asi_p95_error': report.get('asi_p95_error'),
+            'by_feature': report.get('by_feature', {})
+        }
     
     return jsonify(info)
 
 
+@app.route('/models', methods=['GET'])
+def list_models():
+    """
+    Get the model registry: versions, traffic split, shadow model and
+    per-version latency, prediction and drift statistics.
+    """
+    res = resources
+    if res.model_registry is None:
+        return jsonify({'error': 'Model registry not loaded'}), 500
+    return jsonify(res.model_registry.describe())
+
+
 @app.route('/forecast', methods=['POST'])
 def forecast_3_months():
     """
@@ -599,7 +1234,8 @@ def forecast_3_months():
     
     Features independent MBU projections with b/c/d trending.
     """
-    if model is None or master_df is None:
+    res = resources
+    if res.model is None or res.master_df is None:
         return jsonify({'error': 'Model or data not loaded'}), 500
     
     try:
@@ -611,8 +1247,8 @@ def forecast_3_months():
             return jsonify({'error': 'State and district are required'}), 400
         
         # Get all data for the location
-        mask = (master_df['state'] == state) & (master_df['district'] == district)
-        all_data = master_df[mask].sort_values('month')
+        mask = (res.master_df['state'] == state) & (res.master_df['district'] == district)
+        all_data = res.master_df[mask].sort_values('month')
         
         if all_data.empty:
             return jsonify({'error': 'No data found for this location'}), 404
@@ -624,15 +1260,6 @@ def forecast_3_months():
         if len(historical) < 2:
             return jsonify({'error': 'Insufficient historical data (need at least 2 months before 2026)'}), 404
         
-        # Get feature importances
-        if hasattr(model, 'feature_importances_'):
-            importances = model.feature_importances_
-            imp_e = importances[0] if len(importances) > 0 else 0.33
-            imp_d = importances[1] if len(importances) > 1 else 0.33
-            imp_c = importances[2] if len(importances) > 2 else 0.34
-        else:
-            imp_e, imp_d, imp_c = 0.34, 0.33, 0.33
-        
         # Calculate trends from last 3 historical records
         n_trend = min(3, len(historical))
         trend_data = historical.tail(n_trend)
@@ -663,33 +1290,11 @@ def forecast_3_months():
         base_c = float(latest_hist.get(c_col, 25))
         base_d = float(latest_hist.get(d_col, 50))
         
-        # Helper function to calculate indices with unique MBU
-        def calculate_indices(d_e, d_d, d_c, d_b_lag1, d_b_lag2, d_c_lag1, month_num, b, c, d):
-            features = np.array([[d_e, d_d, d_c, d_b_lag1, d_b_lag2, d_c_lag1, month_num]])
-            ml_pred = model.predict(features)[0]
-            
-            asi_raw = (1.0 * ml_pred) + (imp_c * d_c) + (imp_d * d_d) + (imp_e * d_e)
-            # Independent MBU calculation with trended b, c, d
-            mbu = c / (b + d + 1e-6)
-            rp = (b - c) / (b + 1e-6)
-            aers_raw = asi_raw * (mbu + rp)
-            
-            asi_normalized = min(max(abs(ml_pred) * 100 + 50, 0), 100)
-            aers_normalized = min(max(abs(aers_raw), 0), 1)
-            
-            return {
-                'asi': round(asi_normalized, 2),
-                'aers': round(aers_normalized, 4),
-                'mbu': round(mbu, 4),
-                'rp': round(rp, 4),
-                'ml_prediction': round(ml_pred, 6),
-                'd_e': round(d_e, 6),
-                'd_d': round(d_d, 6),
-                'd_c': round(d_c, 6),
-                'b': round(b, 2),
-                'c': round(c, 2),
-                'd': round(d, 2)
-            }
+        # Feature rows of every month shown; all are scored with one predict
+        rows = []
+        
+        def add_row(d_e, d_d, d_c, d_b_lag1, d_b_lag2, d_c_lag1, month_num, b, c, d, **extra):
+            rows.append(([d_e, d_d, d_c, d_b_lag1, d_b_lag2, d_c_lag1, month_num], b, c, d, extra))
         
         # Check if 2026-01 exists in data or needs to be generated
         current_data = all_data[all_data['month'] == CURRENT_MONTH]
@@ -720,18 +1325,16 @@ def forecast_3_months():
             curr_d = base_d + d_trend
             current_is_actual = False
         
-        current = calculate_indices(
+        add_row(
             curr_d_e, curr_d_d, curr_d_c,
             curr_d_b_lag1, curr_d_b_lag2, curr_d_c_lag1,
             1,  # January = month 1
-            curr_b, curr_c, curr_d
+            curr_b, curr_c, curr_d,
+            month=CURRENT_MONTH, is_actual=current_is_actual
         )
-        current['month'] = CURRENT_MONTH
-        current['is_actual'] = current_is_actual
         
         # Generate future months: Feb, Mar, Apr 2026
         future_months = ['2026-02', '2026-03', '2026-04']
-        forecasts = []
         
         prev_d_e, prev_d_d, prev_d_c = curr_d_e, curr_d_d, curr_d_c
         prev_d_b_lag1, prev_d_b_lag2, prev_d_c_lag1 = curr_d_b_lag1, curr_d_b_lag2, curr_d_c_lag1
@@ -756,14 +1359,12 @@ def forecast_3_months():
             # Month number (Feb=2, Mar=3, Apr=4)
             month_num = i + 2
             
-            forecast = calculate_indices(
+            add_row(
                 new_d_e, new_d_d, new_d_c,
                 new_d_b_lag1, new_d_b_lag2, new_d_c_lag1,
-                month_num, new_b, new_c, new_d
+                month_num, new_b, new_c, new_d,
+                month=future_month, is_actual=False
             )
-            forecast['month'] = future_month
-            forecast['is_actual'] = False
-            forecasts.append(forecast)
             
             # Update for next iteration
             prev_d_e, prev_d_d, prev_d_c = new_d_e, new_d_d, new_d_c
@@ -771,12 +1372,8 @@ def forecast_3_months():
             prev_b, prev_c, prev_d = new_b, new_c, new_d
         
         # Historical summary (last 3 records ≤2025-12)
-        historical_summary = []
         for _, row in historical.tail(3).iterrows():
-            hist_b = float(row.get(b_col, 100))
-            hist_c = float(row.get(c_col, 25))
-            hist_d = float(row.get(d_col, 50))
-            hist_indices = calculate_indices(
+            add_row(
                 float(row.get('d_e', 0)),
                 float(row.get('d_d', 0)),
                 float(row.get('d_c', 0)),
@@ -784,11 +1381,29 @@ def forecast_3_months():
                 float(row.get('d_b_lag2', 0)),
                 float(row.get('d_c_lag1', 0)),
                 int(row.get('month_num', 1)),
-                hist_b, hist_c, hist_d
+                float(row.get(b_col, 100)), float(row.get(c_col, 25)), float(row.get(d_col, 50)),
+                month=row['month'], is_actual=True
             )
-            hist_indices['month'] = row['month']
-            hist_indices['is_actual'] = True
-            historical_summary.append(hist_indices)
+        
+        # Score current, future and historical months together
+        features = np.array([r[0] for r in rows], dtype=float)
+        b, c, d = (np.array([r[i] for r in rows], dtype=float) for i in (1, 2, 3))
+        scores = scoring.rounded_scores(scoring.score(res.model, features, b, c, d))
+        inputs = {
+            'd_e': scoring.rounded(features[:, 0], 6),
+            'd_d': scoring.rounded(features[:, 1], 6),
+            'd_c': scoring.rounded(features[:, 2], 6),
+            'b': scoring.rounded(b, 2),
+            'c': scoring.rounded(c, 2),
+            'd': scoring.rounded(d, 2)
+        }
+        indices = [
+            {**{key: values[i] for key, values in scores.items()},
+             **{key: values[i] for key, values in inputs.items()},
+             **rows[i][4]}
+            for i in range(len(rows))
+        ]
+        current, forecasts, historical_summary = indices[0], indices[1:4], indices[4:]
         
         return jsonify({
             'state': state,
@@ -816,6 +1431,49 @@ def forecast_3_months():
         return jsonify({'error': str(e)}), 400
 
 
+@app.route('/backtest', methods=['GET'])
+def get_backtest():
+    """
+    Get the rolling-origin backtest of the /forecast trend extrapolation.
+    
+    Query parameters:
+        horizons: months ahead to evaluate (default 4, max 12)
+        state: only include this state in by_state (optional)
+    
+    Returns MAE and MAPE (%) of ASI, AERS and MBU by horizon and by state.
+    The default report is computed when data is loaded; other horizons are
+    computed on request.
+    """
+    res = resources
+    if res.model is None or res.master_df is None:
+        return jsonify({'error': 'Model or data not loaded'}), 500
+    
+    horizons = request.args.get('horizons', DEFAULT_HORIZONS, type=int)
+    if not 1 <= horizons <= 12:
+        return jsonify({'error': 'horizons must be between 1 and 12'}), 400
+    
+    try:
+        if horizons == DEFAULT_HORIZONS and res.backtest_report is not None:
+            report = res.backtest_report
+        else:
+            report = run_backtest(res.model, res.master_df, horizons=horizons)
+        
+        if 'error' in report:
+            return jsonify(report), 404
+        
+        state = request.args.get('state', '')
+        if state:
+            if state not in report['by_state']:
+                return jsonify({'error': f'No backtest results for state "{state}"'}), 404
+            report = {**report, 'by_state': {state: report['by_state'][state]}}
+        
+        return jsonify(report)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/aggregate', methods=['GET'])
 def get_state_aggregate():
     """
@@ -826,7 +1484,8 @@ def get_state_aggregate():
     
     Returns average ASI, AERS, MBU, and workload composition across all districts.
     """
-    if model is None or master_df is None:
+    res = resources
+    if res.model is None or res.master_df is None:
         return jsonify({'error': 'Model or data not loaded'}), 500
     
     state = request.args.get('state', '')
@@ -836,8 +1495,8 @@ def get_state_aggregate():
     
     try:
         # Get all districts in the state
-        mask = master_df['state'] == state
-        filtered = master_df[mask]
+        mask = res.master_df['state'] == state
+        filtered = res.master_df[mask]
         
         if filtered.empty:
             return jsonify({'error': f'No data for state "{state}"'}), 404
@@ -846,59 +1505,26 @@ def get_state_aggregate():
         latest_month = sorted(filtered['month'].unique())[-1]
         latest_data = filtered[filtered['month'] == latest_month]
         
-        # Get feature importances
-        if hasattr(model, 'feature_importances_'):
-            importances = model.feature_importances_
-            imp_e = importances[0] if len(importances) > 0 else 0.33
-            imp_d = importances[1] if len(importances) > 1 else 0.33
-            imp_c = importances[2] if len(importances) > 2 else 0.34
-        else:
-            imp_e, imp_d, imp_c = 0.34, 0.33, 0.33
-        
-        # Calculate indices for each district and aggregate
-        asi_sum, aers_sum, mbu_sum, rp_sum = 0, 0, 0, 0
-        b_sum, c_sum, d_sum = 0, 0, 0
-        count = 0
-        
-        district_data = []
-        
-        for _, row in latest_data.iterrows():
-            d_e = float(row.get('d_e', 0))
-            d_d = float(row.get('d_d', 0))
-            d_c = float(row.get('d_c', 0))
-            d_b_lag1 = float(row.get('d_b_lag1', 0))
-            d_b_lag2 = float(row.get('d_b_lag2', 0))
-            d_c_lag1 = float(row.get('d_c_lag1', 0))
-            month_num = int(row.get('month_num', 1))
-            b = float(row.get('B', row.get('b', 100)))
-            c = float(row.get('C', row.get('c', 25)))
-            d_val = float(row.get('D', row.get('d', 50)))
-            
-            features = np.array([[d_e, d_d, d_c, d_b_lag1, d_b_lag2, d_c_lag1, month_num]])
-            ml_pred = model.predict(features)[0]
-            
-            asi_raw = (1.0 * ml_pred) + (imp_c * d_c) + (imp_d * d_d) + (imp_e * d_e)
-            mbu = c / (b + d_val + 1e-6)
-            rp = (b - c) / (b + 1e-6)
-            aers_raw = asi_raw * (mbu + rp)
-            
-            asi_normalized = min(max(abs(ml_pred) * 100 + 50, 0), 100)
-            aers_normalized = min(max(abs(aers_raw), 0), 1)
-            
-            asi_sum += asi_normalized
-            aers_sum += aers_normalized
-            mbu_sum += mbu
-            rp_sum += rp
-            b_sum += b
-            c_sum += c
-            d_sum += d_val
-            count += 1
-            
-            district_data.append({
-                'district': row['district'],
-                'asi': round(asi_normalized, 2),
-                'aers': round(aers_normalized, 4)
-            })
+        # Score every district of the month with one batched predict
+        scores = scoring.score_frame(res.model, latest_data)
+        asi = scores['asi'].tolist()
+        aers = scores['aers'].tolist()
+        b, c, d = (values.tolist() for values in scoring.load_columns(latest_data))
+        count = len(asi)
+        
+        # Plain sums add in row order, as the per-district loop used to
+        asi_sum, aers_sum = sum(asi), sum(aers)
+        mbu_sum, rp_sum = sum(scores['mbu'].tolist()), sum(scores['rp'].tolist())
+        b_sum, c_sum, d_sum = sum(b), sum(c), sum(d)
+        
+        district_data = [
+            {'district': district, 'asi': asi_value, 'aers': aers_value}
+            for district, asi_value, aers_value in zip(
+                latest_data['district'].tolist(),
+                scoring.rounded(asi, 2),
+                scoring.rounded(aers, 4)
+            )
+        ]
         
         avg_asi = asi_sum / count if count > 0 else 0
         avg_aers = aers_sum / count if count > 0 else 0
@@ -933,21 +1559,185 @@ def get_state_aggregate():
         return jsonify({'error': str(e)}), 500
 
 
+# Furthest month past the data that /schedule will project to
+MAX_SCHEDULE_HORIZON = 12
+
+
+def schedule_frame(res, month):
+    """
+    One row per district with state, district, asi, aers, mbu, b, c, d for
+    a month: the precomputed scores if the month is in the data, otherwise
+    the /forecast trend projection from the latest month, scored in one pass.
+    
+    Returns (frame, projected), or raises ScheduleError.
+    """
+    months = sorted(res.scored_df['month'].unique().tolist())
+    if month in months:
+        rows = res.scored_df[res.scored_df['month'] == month]
+        frame = pd.DataFrame({
+            'state': rows['state'].to_numpy(),
+            'district': rows['district'].to_numpy(),
+            'asi': rows['score_asi'].to_numpy(),
+            'aers': rows['score_aers'].to_numpy(),
+            'mbu': rows['score_mbu'].to_numpy(),
+            'b': rows['B'].to_numpy(dtype=float),
+            'c': rows['C'].to_numpy(dtype=float),
+            'd': rows['D'].to_numpy(dtype=float)
+        })
+        return frame, False
+    
+    latest = months[-1]
+    horizon = next((h for h in range(1, MAX_SCHEDULE_HORIZON + 1) if add_months(latest, h) == month), None)
+    if horizon is None:
+        raise scheduler.ScheduleError(
+            f'No data for "{month}". Use a month in the data ({", ".join(months)}) '
+            f'or up to {MAX_SCHEDULE_HORIZON} months after {latest}'
+        )
+    projections = project_origin(res.scored_df, latest, horizon)
+    rows = projections[projections['horizon'] == horizon]
+    b, c, d = (rows[col].to_numpy(dtype=float) for col in ('b', 'c', 'd'))
+    scores = scoring.score(res.model, rows[scoring.FEATURE_COLUMNS].to_numpy(dtype=float), b, c, d)
+    frame = pd.DataFrame({
+        'state': rows['state'].to_numpy(),
+        'district': rows['district'].to_numpy(),
+        'asi': scores['asi'],
+        'aers': scores['aers'],
+        'mbu': scores['mbu'],
+        'b': b,
+        'c': c,
+        'd': d
+    })
+    return frame, True
+
+
+@app.route('/schedule', methods=['POST'])
+def plan_schedule():
+    """
+    Allocate mobile enrolment units and camp-days across districts for a month.
+    
+    Request body (JSON):
+        month: target month, in the data or up to 12 months after it (default: latest)
+        mobile_units: units available nationwide (default 0)
+        camp_days: camp-days per state, one number for all or {state: days} (default 0)
+        states: only plan for these states (optional)
+        unit_capacity: updates one unit handles in the month (default 2000)
+        camp_day_capacity: child updates per camp-day (default 300)
+        max_units_per_district: default 10
+        max_camp_days_per_district: default 30
+    
+    Returns:
+        Districts that received capacity, sorted by risk removed, with the
+        marginal risk reduction of their last and next unit, plus budget use
+        and marginal reduction per resource (see scheduler.py for the model)
+    """
+    res = resources
+    if res.model is None or res.scored_df is None:
+        return jsonify({'error': 'Model or data not loaded'}), 500
+    
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    
+    try:
+        month = data.get('month') or res.scored_df['month'].max()
+        frame, projected = schedule_frame(res, month)
+        
+        states = data.get('states')
+        if states:
+            if not isinstance(states, list):
+                raise scheduler.ScheduleError('states must be a list of state names')
+            frame = frame[frame['state'].isin(states)]
+            if frame.empty:
+                return jsonify({'error': 'No districts found for the requested states'}), 404
+        
+        result = scheduler.allocate(
+            frame,
+            mobile_units=scheduler.parse_count(data, 'mobile_units', 0, scheduler.MAX_MOBILE_UNITS),
+            camp_days=scheduler.parse_camp_days(data.get('camp_days', 0), set(frame['state'])),
+            unit_capacity=scheduler.parse_count(
+                data, 'unit_capacity', scheduler.DEFAULT_UNIT_CAPACITY, 10 ** 9, lower=1),
+            camp_day_capacity=scheduler.parse_count(
+                data, 'camp_day_capacity', scheduler.DEFAULT_CAMP_DAY_CAPACITY, 10 ** 9, lower=1),
+            max_units=scheduler.parse_count(
+                data, 'max_units_per_district', scheduler.DEFAULT_MAX_UNITS_PER_DISTRICT, 1000),
+            max_camp_days=scheduler.parse_count(
+                data, 'max_camp_days_per_district', scheduler.DEFAULT_MAX_CAMP_DAYS_PER_DISTRICT, 1000)
+        )
+        return jsonify({'month': month, 'is_projected': projected, **result})
+    
+    except scheduler.ScheduleError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/events', methods=['GET'])
+def score_events():
+    """
+    Subscribe to score updates as server-sent events.
+    
+    Sends a "hello" event with the current data version, then one "scores"
+    event each time the model or data files are refreshed, holding only the
+    districts, months and state aggregates whose values changed. A "resync"
+    event means the client missed updates and should refetch /aggregate and
+    /history. Browsers' EventSource resends Last-Event-ID on reconnect.
+    
+    Query parameters:
+        last_event_id: id of the last "scores" event received (optional)
+    """
+    res = resources
+    if res.model is None or res.scored_df is None:
+        return jsonify({'error': 'Model or data not loaded'}), 500
+    
+    raw_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(raw_id) if raw_id else None
+    except ValueError:
+        return jsonify({'error': 'last_event_id must be an integer'}), 400
+    
+    subscription = score_feed.subscribe(last_event_id)
+    if subscription is None:
+        return service_unavailable(
+            'Too many event subscribers on this worker, retry later',
+            subscribers=score_feed.max_subscribers
+        )
+    subscriber, missed = subscription
+    
+    response = Response(score_feed.stream(subscriber, missed), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    # Also covers clients that leave before the first event is sent
+    response.call_on_close(lambda: score_feed.unsubscribe(subscriber))
+    return response
+
+
 if __name__ == '__main__':
     print("\n" + "="*60)
     print("  Aadhaar Risk Model API Server (3-Month Forecast)")
     print("="*60)
     print(f"  Running on http://localhost:5000")
     print(f"  Endpoints:")
-    print(f"    GET  /health        - Health check")
+    print(f"    GET  /health        - Liveness check")
+    print(f"    GET  /ready         - Readiness check")
+    print(f"    GET  /admission     - Admission control queues and shed counts")
     print(f"    GET  /metadata      - Get states, districts, months")
     print(f"    GET  /districts     - Get districts for a state")
     print(f"    GET  /history       - Historical time-series data")
+    print(f"    POST /history/bulk  - Time series for many districts")
     print(f"    GET  /aggregate     - State-level aggregate metrics")
+    print(f"    GET  /dataset       - Paged, filtered master data rows")
+    print(f"    GET  /anomalies     - Districts flagged by the anomaly scan")
+    print(f"    GET  /events        - Score updates after refreshes (SSE)")
     print(f"    GET  /model-info    - Model information")
+    print(f"    GET  /models        - Model registry versions and stats")
     print(f"    POST /predict       - Single prediction")
     print(f"    POST /forecast      - 3-month forecast")
+    print(f"    GET  /backtest      - Forecast accuracy backtest")
+    print(f"    POST /schedule      - Allocate mobile units and camp-days")
     print(f"    POST /batch-predict - Batch predictions")
+    print(f"    POST /batch-predict/stream - Large NDJSON/CSV batches")
     print("="*60 + "\n")
     
     app.run(host='0.0.0.0', port=5000, debug=True)
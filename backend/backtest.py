@@ -0,0 +1,216 @@
+"""
+Rolling-origin backtest of the /forecast trend extrapolation.
+
+For every historical origin month the forecast is replayed for all districts
+at once: the last-3-record trends, the first projected month (lag proxies,
+no clamping) and the recursive lag updates of the following months are all
+computed on arrays, and every (origin, horizon, district) feature row is
+scored with a single model.predict. Forecast ASI, AERS and MBU are compared
+with the scores of the actual rows for the target months.
+
+month_num is the calendar month of each target (origin + horizon months).
+/forecast hard-codes month_num 1 for its current month and 2, 3, 4 for the
+months after it; those are the calendar months of its targets 2026-01..04
+from the fixed 2025-12 cutoff, so project_origin(df, '2025-12', 4) gives the
+same feature rows as /forecast. From other origins the backtest uses the
+targets' real months rather than /forecast's constants.
+
+Usage:
+    python backtest.py [--horizons 4] [--output backtest.json]
+"""
+
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import scoring
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_HORIZONS = 4
+METRICS = ['asi', 'aers', 'mbu']
+
+# Actual values closer to zero than this are left out of MAPE
+MAPE_EPSILON = 1e-6
+
+
+def add_months(month, n):
+    """Shift a "YYYY-MM" string by n calendar months."""
+    year, mon = int(month[:4]), int(month[5:7])
+    total = year * 12 + (mon - 1) + n
+    return f'{total // 12:04d}-{total % 12 + 1:02d}'
+
+
+def project_origin(df, origin, horizons):
+    """
+    Replay the /forecast feature projection for every district with at least
+    two records up to and including the origin month.
+
+    Returns a frame with one row per (district, horizon) holding the
+    projected model features and b/c/d.
+    """
+    hist = df[df['month'] <= origin]
+    window = hist.groupby(['state', 'district'], sort=False).tail(3)
+    grouped = window.groupby(['state', 'district'], sort=False)
+    first = grouped.first()
+    last = grouped.last()
+    n_trend = grouped.size()
+
+    eligible = n_trend >= 2
+    first, last, n_trend = first[eligible], last[eligible], n_trend[eligible]
+    if last.empty:
+        return pd.DataFrame()
+
+    steps = np.maximum(n_trend.to_numpy() - 1, 1)
+    trend = {col: (last[col].to_numpy(dtype=float) - first[col].to_numpy(dtype=float)) / steps
+             for col in ('d_e', 'd_d', 'd_c', 'B', 'C', 'D')}
+    base = {col: last[col].to_numpy(dtype=float)
+            for col in ('d_e', 'd_d', 'd_c', 'd_b_lag1', 'd_b_lag2', 'd_c_lag1', 'B', 'C', 'D')}
+
+    frames = []
+    # Horizon 1 is the "current" month of /forecast: lag proxies, no clamping
+    cur = {
+        'd_e': base['d_e'] + trend['d_e'],
+        'd_d': base['d_d'] + trend['d_d'],
+        'd_c': base['d_c'] + trend['d_c'],
+        'd_b_lag1': base['d_e'],
+        'd_b_lag2': base['d_b_lag1'],
+        'd_c_lag1': base['d_c'],
+        'b': base['B'] + trend['B'],
+        'c': base['C'] + trend['C'],
+        'd': base['D'] + trend['D']
+    }
+    for h in range(1, horizons + 1):
+        if h > 1:
+            prev = cur
+            cur = {
+                'd_e': prev['d_e'] + trend['d_e'],
+                'd_d': prev['d_d'] + trend['d_d'],
+                'd_c': prev['d_c'] + trend['d_c'],
+                'd_b_lag2': prev['d_b_lag1'],
+                'd_b_lag1': prev['d_e'],
+                'd_c_lag1': prev['d_c'],
+                'b': np.maximum(prev['b'] + trend['B'], 1),
+                'c': np.maximum(prev['c'] + trend['C'], 0),
+                'd': np.maximum(prev['d'] + trend['D'], 1)
+            }
+        target = add_months(origin, h)
+        frame = pd.DataFrame(cur, index=last.index)
+        frame['month_num'] = int(target[5:7])
+        frame['origin'] = origin
+        frame['horizon'] = h
+        frame['month'] = target
+        frames.append(frame)
+
+    return pd.concat(frames).reset_index()
+
+
+def run_backtest(model, df, horizons=DEFAULT_HORIZONS):
+    """
+    Backtest the forecast from every origin month and summarize errors.
+
+    df is the master data with its state, district and month columns.
+    Returns a JSON-ready dict with MAE and MAPE by horizon and by state.
+    """
+    start = time.perf_counter()
+    df = df.sort_values(['state', 'district', 'month'], kind='stable')
+    months = sorted(df['month'].unique())
+
+    # Origins need at least two earlier records and something to compare with
+    projections = pd.concat(
+        [project_origin(df, origin, horizons) for origin in months[1:-1]],
+        ignore_index=True
+    )
+    if projections.empty:
+        return {'error': 'Not enough months for a backtest'}
+
+    X = projections[scoring.FEATURE_COLUMNS].to_numpy(dtype=float)
+    predicted = scoring.score(model, X, projections['b'].to_numpy(), projections['c'].to_numpy(),
+                              projections['d'].to_numpy())
+
+    actual_rows = df.drop_duplicates(['state', 'district', 'month'])
+    actual = scoring.score(model, actual_rows[scoring.FEATURE_COLUMNS].to_numpy(dtype=float),
+                           actual_rows['B'].to_numpy(dtype=float), actual_rows['C'].to_numpy(dtype=float),
+                           actual_rows['D'].to_numpy(dtype=float))
+    actual_frame = actual_rows[['state', 'district', 'month']].assign(
+        **{f'actual_{m}': actual[m] for m in METRICS})
+
+    pairs = projections[['state', 'district', 'month', 'origin', 'horizon']].assign(
+        **{f'pred_{m}': predicted[m] for m in METRICS})
+    pairs = pairs.merge(actual_frame, on=['state', 'district', 'month'], how='inner')
+
+    for m in METRICS:
+        err = (pairs[f'pred_{m}'] - pairs[f'actual_{m}']).abs()
+        denom = pairs[f'actual_{m}'].abs()
+        pairs[f'ae_{m}'] = err
+        pairs[f'ape_{m}'] = (err / denom).where(denom > MAPE_EPSILON)
+
+    def summarize(grouped):
+        agg = grouped.agg(
+            n=('ae_asi', 'size'),
+            **{f'mae_{m}': (f'ae_{m}', 'mean') for m in METRICS},
+            **{f'mape_{m}': (f'ape_{m}', 'mean') for m in METRICS}
+        )
+        rows = []
+        for key, row in agg.iterrows():
+            entry = {'pairs': int(row['n'])}
+            for m in METRICS:
+                mape = row[f'mape_{m}']
+                entry[m] = {
+                    'mae': round(float(row[f'mae_{m}']), 6),
+                    'mape': None if pd.isna(mape) else round(float(mape) * 100, 2)
+                }
+            rows.append((key, entry))
+        return rows
+
+    by_horizon = {int(h): entry for h, entry in summarize(pairs.groupby('horizon'))}
+    by_state = {}
+    for (state, h), entry in summarize(pairs.groupby(['state', 'horizon'])):
+        by_state.setdefault(state, {})[int(h)] = entry
+
+    return {
+        'origins': sorted(pairs['origin'].unique().tolist()),
+        'horizons': horizons,
+        'forecasts': int(len(projections)),
+        'compared_pairs': int(len(pairs)),
+        'by_horizon': by_horizon,
+        'by_state': by_state,
+        'elapsed_seconds': round(time.perf_counter() - start, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rolling-origin backtest of the 3-month forecast.')
+    parser.add_argument('--horizons', type=int, default=DEFAULT_HORIZONS)
+    parser.add_argument('--output', help='Write the full report as JSON')
+    args = parser.parse_args()
+
+    model = joblib.load(os.path.join(BASE_DIR, 'uidai_risk_model.pkl'))
+    df = pd.read_csv(os.path.join(BASE_DIR, 'processed_master_data.csv'))
+    df.columns = df.columns.str.strip()
+
+    report = run_backtest(model, df, horizons=args.horizons)
+    if 'error' in report:
+        print(f"✗ {report['error']}")
+        return
+
+    print(f"✓ Backtest of {report['forecasts']} forecasts from origins {', '.join(report['origins'])} "
+          f"({report['compared_pairs']} with actuals) in {report['elapsed_seconds']}s")
+    for h, entry in report['by_horizon'].items():
+        metrics = '  '.join(
+            f"{m.upper()} MAE {entry[m]['mae']:.4f} MAPE {entry[m]['mape']}%" for m in METRICS)
+        print(f"  h={h} (n={entry['pairs']}): {metrics}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
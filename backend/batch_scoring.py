@@ -0,0 +1,226 @@
+"""
+Chunked, multi-process scoring for very large batches of manual scenarios.
+
+Rows are read from an NDJSON or CSV stream, grouped into chunks and scored in
+parallel by a process pool sized to the available cores. Each worker process
+loads the model once and returns its chunk already rendered as NDJSON, and the
+caller yields chunks in input order as they finish. At most MAX_IN_FLIGHT
+chunks are pending at a time, so memory stays bounded whatever the batch size.
+
+This module must not import app: spawned workers import it on start-up.
+The indices come from the shared scoring kernel.
+"""
+
+import csv
+import io
+import json
+import math
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import joblib
+import numpy as np
+
+import scoring
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CHUNK_SIZE = int(os.environ.get('UIDAI_BATCH_CHUNK_SIZE', '5000'))
+POOL_SIZE = int(os.environ.get('UIDAI_BATCH_WORKERS', '0')) or os.cpu_count() or 1
+MAX_IN_FLIGHT = 2 * POOL_SIZE
+
+# Input columns in the order the scoring kernel expects them
+INPUT_COLUMNS = ['d_e', 'd_d', 'd_c', 'd_b_lag1', 'd_b_lag2', 'd_c_lag1', 'month_num', 'b', 'c', 'd']
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Per-process state of pool workers
+_worker_model = None
+
+
+def parse_scenario(raw, default_month):
+    """
+    Turn one input record into the 10 kernel inputs, applying the same
+    defaults as /predict manual mode. NaN and infinite values are rejected.
+    """
+    d_c = float(raw.get('d_c') or 0)
+    values = [
+        float(raw.get('d_e') or 0),
+        float(raw.get('d_d') or 0),
+        d_c,
+        float(raw.get('d_b_lag1') or 0),
+        float(raw.get('d_b_lag2') or 0),
+        float(raw.get('d_c_lag1') if raw.get('d_c_lag1') not in (None, '') else d_c * 0.9),
+        int(float(raw.get('month_num') or default_month)),
+        float(raw.get('b') if raw.get('b') not in (None, '') else 100),
+        float(raw.get('c') if raw.get('c') not in (None, '') else 25),
+        float(raw.get('d') if raw.get('d') not in (None, '') else 50)
+    ]
+    if not all(math.isfinite(v) for v in values):
+        raise ValueError('Scenario values must be finite numbers')
+    return values
+
+
+def iter_records(stream, fmt):
+    """Yield dicts (or parse errors as strings) from an NDJSON or CSV byte stream."""
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if fmt == 'csv':
+        for row in csv.DictReader(text):
+            yield row
+        return
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield f'Invalid JSON: {e}'
+            continue
+        yield record if isinstance(record, dict) else 'Each line must be a JSON object'
+
+
+def iter_chunks(records, default_month, chunk_size=CHUNK_SIZE):
+    """Group parsed records into (start_index, values, errors) chunks."""
+    start = 0
+    values, errors = [], {}
+    for i, record in enumerate(records):
+        try:
+            if isinstance(record, str):
+                raise ValueError(record)
+            if 'state' in record and 'district' in record and 'month' in record:
+                raise ValueError('Location lookups are not supported in large-batch mode; use /batch-predict')
+            values.append(parse_scenario(record, default_month))
+        except (TypeError, ValueError, OverflowError) as e:
+            errors[i - start] = str(e)
+            values.append(None)
+        if len(values) == chunk_size:
+            yield start, values, errors
+            start = i + 1
+            values, errors = [], {}
+    if values:
+        yield start, values, errors
+
+
+def _init_worker(model_path):
+    global _worker_model
+    _worker_model = joblib.load(model_path)
+
+
+def score_chunk(start, values, errors):
+    """Score one chunk inside a pool worker and render it as NDJSON lines."""
+    valid = [v for v in values if v is not None]
+    lines = []
+    if valid:
+        X = np.array(valid, dtype=float)
+        rounded = scoring.rounded_scores(
+            scoring.score(_worker_model, X[:, :7], X[:, 7], X[:, 8], X[:, 9])
+        )
+        scores = zip(rounded['asi'], rounded['aers'], rounded['mbu'], rounded['rp'],
+                     rounded['ml_prediction'])
+    else:
+        scores = iter(())
+
+    for offset, row in enumerate(values):
+        index = start + offset
+        if row is None:
+            lines.append(json.dumps({'index': index, 'error': errors[offset]}))
+            continue
+        asi, aers, mbu_v, rp_v, ml = next(scores)
+        lines.append(json.dumps({
+            'index': index, 'asi': asi, 'aers': aers, 'mbu': mbu_v, 'rp': rp_v, 'ml_prediction': ml
+        }))
+    return '\n'.join(lines) + '\n', len(values), len(errors)
+
+
+def get_pool():
+    """Return the shared process pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded web worker is not safe
+            _pool = ProcessPoolExecutor(
+                max_workers=POOL_SIZE,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(os.path.join(BASE_DIR, 'uidai_risk_model.pkl'),)
+            )
+        return _pool
+
+
+def reset_pool():
+    """
+    Start a fresh pool (with the current model file) on the next batch.
+
+    Streams still running keep the old pool; it shuts its workers down once
+    nothing references it any more.
+    """
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def stream_scores(records, default_month, chunk_size=CHUNK_SIZE):
+    """
+    Score records across the pool and yield NDJSON text in input order.
+
+    A progress line ({"progress": {...}}) follows every chunk and a final
+    {"done": {...}} line closes the stream. Rows of a chunk that fails in
+    the pool get {"index", "error"} lines; the stream carries on.
+    """
+    pool = get_pool()
+    pending = deque()
+    rows_done = chunks_done = error_count = 0
+
+    def drain_head():
+        nonlocal rows_done, chunks_done, error_count
+        future, start, size = pending.popleft()
+        try:
+            text, n_rows, n_errors = future.result()
+        except Exception as e:
+            # A failed chunk (e.g. a crashed worker) fails only its own rows
+            message = f'Chunk failed: {e}'
+            text = ''.join(json.dumps({'index': start + offset, 'error': message}) + '\n'
+                           for offset in range(size))
+            n_rows = n_errors = size
+            if isinstance(e, BrokenProcessPool):
+                reset_pool()
+        rows_done += n_rows
+        chunks_done += 1
+        error_count += n_errors
+        progress = {'rows_done': rows_done, 'chunks_done': chunks_done, 'errors': error_count}
+        return text + json.dumps({'progress': progress}) + '\n'
+
+    try:
+        for start, values, errors in iter_chunks(records, default_month, chunk_size):
+            try:
+                future = pool.submit(score_chunk, start, values, errors)
+            except BrokenProcessPool as e:
+                future = Future()
+                future.set_exception(e)
+            pending.append((future, start, len(values)))
+            # Keep memory bounded: wait for the oldest chunk before queuing more
+            while len(pending) >= MAX_IN_FLIGHT or (pending and pending[0][0].done()):
+                yield drain_head()
+
+        while pending:
+            yield drain_head()
+    finally:
+        # Client went away: drop work nobody will read
+        for future, _, _ in pending:
+            future.cancel()
+
+    yield json.dumps({'done': {'rows': rows_done, 'chunks': chunks_done, 'errors': error_count}}) + '\n'
@@ -0,0 +1,242 @@
+"""
+Paged, filtered access to the processed master data for the /dataset endpoint.
+
+Every column is held as a NumPy array, with row positions indexed by
+location and by month and sort orders (and their ranks) computed once per
+column. The first page of a query resolves its matching rows, in output
+order, from those indexes and caches them; every further page is a slice of
+that array, so its cost grows with the page size rather than with the table.
+"""
+
+import base64
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Resolved queries kept for paging (least recently used are dropped)
+CANDIDATE_CACHE_SIZE = 64
+
+# Numeric threshold filters such as "AERS_current>0.5"
+FILTER_PATTERN = re.compile(
+    r'^\s*(\w+)\s*(>=|<=|!=|==|>|<)\s*(-?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*$'
+)
+
+OPERATORS = {
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '!=': np.not_equal
+}
+
+
+class DatasetQueryError(ValueError):
+    """Raised for invalid query parameters or cursors (answered with 400)."""
+
+
+def parse_filter(expression):
+    """Parse "column>value" into (column, operator, float value)."""
+    match = FILTER_PATTERN.match(expression)
+    if not match:
+        raise DatasetQueryError(
+            f'Invalid filter "{expression}". Use column<op>number with op in >, >=, <, <=, ==, !='
+        )
+    column, op, value = match.groups()
+    return column, op, float(value)
+
+
+class DatasetIndex:
+    """Column arrays, per-location positions and cached sort orders for one dataset version."""
+
+    def __init__(self, df, version):
+        self.version = str(version)
+        self.columns = list(df.columns)
+        self.n_rows = len(df)
+        self.numeric_columns = set(df.select_dtypes(include='number').columns)
+
+        self.arrays = {}
+        for col in self.columns:
+            if col in self.numeric_columns:
+                self.arrays[col] = df[col].to_numpy()
+            else:
+                self.arrays[col] = df[col].to_numpy(dtype=str)
+
+        # Row positions (ascending) of each state and each (state, district)
+        self.state_positions = df.groupby('state', sort=False).indices
+        self.location_positions = df.groupby(['state', 'district'], sort=False).indices
+
+        # Row positions ordered by month, for month ranges via searchsorted
+        self.month_order = np.argsort(self.arrays['month'], kind='stable')
+        self.sorted_months = self.arrays['month'][self.month_order]
+
+        self._sort_orders = {}
+        self._sort_ranks = {}
+        self._sort_lock = threading.Lock()
+        self._candidates = OrderedDict()
+        self._candidates_lock = threading.Lock()
+
+    def sort_order(self, column, descending=False):
+        """Return the cached row order for a column (NaN values always last)."""
+        key = (column, descending)
+        order = self._sort_orders.get(key)
+        if order is None:
+            values = self.arrays[column]
+            if column in self.numeric_columns:
+                order = np.argsort(-values if descending else values, kind='stable')
+            else:
+                order = np.argsort(values, kind='stable')
+                if descending:
+                    order = order[::-1].copy()
+            with self._sort_lock:
+                self._sort_orders[key] = order
+        return order
+
+    def sort_rank(self, column, descending=False):
+        """Return each row's position in the cached sort order."""
+        key = (column, descending)
+        rank = self._sort_ranks.get(key)
+        if rank is None:
+            order = self.sort_order(column, descending)
+            rank = np.empty(self.n_rows, dtype=np.intp)
+            rank[order] = np.arange(self.n_rows)
+            with self._sort_lock:
+                self._sort_ranks[key] = rank
+        return rank
+
+    def month_positions(self, month_from=None, month_to=None):
+        """Ascending row positions with month in [month_from, month_to]."""
+        lo = np.searchsorted(self.sorted_months, month_from, side='left') if month_from else 0
+        hi = np.searchsorted(self.sorted_months, month_to, side='right') if month_to else self.n_rows
+        return np.sort(self.month_order[lo:hi])
+
+    def resolve(self, state, district, month_from, month_to, filters, sort, order):
+        """All matching row positions in output order."""
+        # Smallest indexed row set first: the location, else the month range
+        if district:
+            base = self.location_positions.get((state, district), np.empty(0, dtype=np.intp))
+        elif state:
+            base = self.state_positions.get(state, np.empty(0, dtype=np.intp))
+        elif month_from or month_to:
+            base = self.month_positions(month_from, month_to)
+        else:
+            base = None
+
+        if base is not None and state and (month_from or month_to):
+            months = self.arrays['month'][base]
+            mask = np.ones(len(base), dtype=bool)
+            if month_from:
+                mask &= months >= month_from
+            if month_to:
+                mask &= months <= month_to
+            base = base[mask]
+
+        if filters:
+            positions = base if base is not None else np.arange(self.n_rows)
+            mask = np.ones(len(positions), dtype=bool)
+            for col, op, value in filters:
+                mask &= OPERATORS[op](self.arrays[col][positions], value)
+            base = positions[mask]
+
+        if not sort:
+            return base if base is not None else np.arange(self.n_rows)
+        if base is None:
+            return self.sort_order(sort, descending=(order == 'desc'))
+        rank = self.sort_rank(sort, descending=(order == 'desc'))
+        return base[np.argsort(rank[base], kind='stable')]
+
+    def candidates(self, fingerprint, *query):
+        """Resolved positions for a query, cached per query fingerprint."""
+        with self._candidates_lock:
+            positions = self._candidates.get(fingerprint)
+            if positions is not None:
+                self._candidates.move_to_end(fingerprint)
+                return positions
+        positions = self.resolve(*query)
+        with self._candidates_lock:
+            self._candidates[fingerprint] = positions
+            while len(self._candidates) > CANDIDATE_CACHE_SIZE:
+                self._candidates.popitem(last=False)
+        return positions
+
+    def encode_cursor(self, offset, fingerprint):
+        payload = json.dumps({'o': int(offset), 'q': fingerprint, 'v': self.version})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor, fingerprint):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            offset = int(payload['o'])
+        except Exception:
+            raise DatasetQueryError('Invalid cursor')
+
+        if payload.get('v') != self.version:
+            raise DatasetQueryError('Cursor is from an older version of the dataset, restart from the first page')
+        if payload.get('q') != fingerprint or offset < 0:
+            raise DatasetQueryError('Cursor does not match this query')
+        return offset
+
+    def query(self, columns=None, state=None, district=None, month_from=None, month_to=None,
+              filters=(), sort=None, order='asc', limit=DEFAULT_PAGE_SIZE, cursor=None):
+        """
+        Return one page of rows matching the query.
+
+        Returns a dict with the projected columns, the page rows and the
+        cursor for the next page (None on the last page).
+        """
+        columns = list(columns) if columns else list(self.columns)
+        unknown = [col for col in columns if col not in self.arrays]
+        if unknown:
+            raise DatasetQueryError(f'Unknown columns: {", ".join(unknown)}')
+
+        parsed_filters = [parse_filter(f) for f in filters]
+        for col, _, _ in parsed_filters:
+            if col not in self.arrays:
+                raise DatasetQueryError(f'Unknown filter column "{col}"')
+            if col not in self.numeric_columns:
+                raise DatasetQueryError(f'Filter column "{col}" is not numeric')
+
+        if sort and sort not in self.arrays:
+            raise DatasetQueryError(f'Unknown sort column "{sort}"')
+        if order not in ('asc', 'desc'):
+            raise DatasetQueryError('order must be "asc" or "desc"')
+        if district and not state:
+            raise DatasetQueryError('district filter requires state')
+
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+        fingerprint = hashlib.sha1(json.dumps(
+            [state, district, month_from, month_to, sorted(filters), sort, order]
+        ).encode()).hexdigest()[:16]
+        offset = self.decode_cursor(cursor, fingerprint) if cursor else 0
+
+        candidates = self.candidates(fingerprint, state, district, month_from, month_to,
+                                     parsed_filters, sort, order)
+        page_positions = candidates[offset:offset + limit]
+        offset += len(page_positions)
+
+        projected = {}
+        for col in columns:
+            values = self.arrays[col][page_positions]
+            if values.dtype.kind == 'f':
+                values = np.where(np.isnan(values), None, values)
+            projected[col] = values.tolist()
+        rows = [dict(zip(columns, values)) for values in zip(*(projected[col] for col in columns))]
+
+        # Only hand out a cursor if another matching row exists
+        has_more = offset < len(candidates)
+        return {
+            'columns': columns,
+            'rows': rows,
+            'count': len(rows),
+            'limit': limit,
+            'next_cursor': self.encode_cursor(offset, fingerprint) if has_more else None
+        }
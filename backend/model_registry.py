@@ -0,0 +1,328 @@
+"""
+Versioned model registry with traffic splitting and shadow scoring.
+
+The model at the top of the backend folder is the "default" version. More
+versions live in the registry directory, one folder per version, each with
+the same pair of files:
+
+    models/
+        v2/
+            uidai_risk_model.pkl
+            model_features.pkl
+
+A version's model_features.pkl must list scoring.FEATURE_COLUMNS in the same
+order, since every caller builds its feature matrix in that order; versions
+that do not are left out and reported in load_errors.
+
+Every version is loaded once per worker and shared by all requests. A request
+can ask for a version explicitly; otherwise UIDAI_MODEL_TRAFFIC routes a
+percentage of requests to other versions (e.g. "v2=10,v3=5"). When
+UIDAI_MODEL_SHADOW names a candidate version, it also scores every feature
+matrix the serving model scored, on a background thread, so the response is
+not delayed. Each version records its latency and prediction statistics, and
+shadow versions record their drift from the serving model.
+
+When the worker reloads its files, the new registry takes over the versions
+whose model file is unchanged (same fingerprint), with their statistics, and
+only loads the ones that changed.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+
+import scoring
+from surrogate import model_fingerprint
+
+DEFAULT_VERSION = 'default'
+MODEL_FILE = 'uidai_risk_model.pkl'
+FEATURES_FILE = 'model_features.pkl'
+
+REGISTRY_DIR = os.environ.get(
+    'UIDAI_MODEL_REGISTRY',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+)
+TRAFFIC_SPLIT = os.environ.get('UIDAI_MODEL_TRAFFIC', '')
+SHADOW_VERSION = os.environ.get('UIDAI_MODEL_SHADOW', '')
+
+# Shadow jobs beyond this backlog are dropped rather than queued
+SHADOW_MAX_PENDING = int(os.environ.get('UIDAI_SHADOW_MAX_PENDING', '100'))
+
+# Latency samples kept per version for percentiles
+LATENCY_WINDOW = 1000
+
+
+class RegistryError(ValueError):
+    """Raised for unknown versions or an invalid traffic split (answered with 400)."""
+
+
+def parse_traffic_split(spec):
+    """Parse "v2=10,v3=5" into {"v2": 10.0, "v3": 5.0} percentages."""
+    split = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        name, _, percent = part.partition('=')
+        try:
+            split[name.strip()] = float(percent)
+        except ValueError:
+            raise RegistryError(f'Invalid traffic split entry "{part}"')
+    if sum(split.values()) > 100:
+        raise RegistryError('Traffic split percentages add up to more than 100')
+    return split
+
+
+class VersionStats:
+    """Latency, prediction and drift statistics for one model version."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.rows = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.pred_sum = 0.0
+        self.pred_sq_sum = 0.0
+        # Shadow comparison against the serving model
+        self.shadow_rows = 0
+        self.diff_sum = 0.0
+        self.abs_diff_sum = 0.0
+        self.max_abs_diff = 0.0
+
+    def record(self, seconds, predictions):
+        with self.lock:
+            self.calls += 1
+            self.rows += len(predictions)
+            self.latencies.append(seconds)
+            self.pred_sum += float(predictions.sum())
+            self.pred_sq_sum += float(np.square(predictions).sum())
+
+    def record_drift(self, predictions, reference):
+        diff = predictions - reference
+        with self.lock:
+            self.shadow_rows += len(diff)
+            self.diff_sum += float(diff.sum())
+            self.abs_diff_sum += float(np.abs(diff).sum())
+            self.max_abs_diff = max(self.max_abs_diff, float(np.abs(diff).max()))
+
+    def summary(self):
+        with self.lock:
+            latencies = np.array(self.latencies) * 1000
+            summary = {
+                'calls': self.calls,
+                'rows': self.rows,
+                'latency_ms': {
+                    'mean': round(float(latencies.mean()), 3) if len(latencies) else None,
+                    'p95': round(float(np.percentile(latencies, 95)), 3) if len(latencies) else None,
+                    'max': round(float(latencies.max()), 3) if len(latencies) else None
+                },
+                'prediction': None
+            }
+            if self.rows:
+                mean = self.pred_sum / self.rows
+                variance = max(self.pred_sq_sum / self.rows - mean ** 2, 0.0)
+                summary['prediction'] = {'mean': round(mean, 6), 'std': round(variance ** 0.5, 6)}
+            if self.shadow_rows:
+                summary['drift'] = {
+                    'rows': self.shadow_rows,
+                    'mean_diff': round(self.diff_sum / self.shadow_rows, 6),
+                    'mean_abs_diff': round(self.abs_diff_sum / self.shadow_rows, 6),
+                    'max_abs_diff': round(self.max_abs_diff, 6)
+                }
+            return summary
+
+
+class ModelVersion:
+    """A loaded model that records its own latency and feeds the shadow model."""
+
+    def __init__(self, name, model, feature_names, registry, path=None, fingerprint=None):
+        self.name = name
+        self.model = model
+        self.feature_names = list(feature_names)
+        self.path = path
+        self.fingerprint = fingerprint
+        self.registry = registry
+        # Requests this version served, and the shadow runs it made
+        self.stats = VersionStats()
+        self.shadow_stats = VersionStats()
+
+    @property
+    def feature_importances_(self):
+        return self.model.feature_importances_
+
+    @property
+    def n_features_in_(self):
+        return self.model.n_features_in_
+
+    def __getattr__(self, attr):
+        # Anything else (n_estimators, ...) comes from the wrapped model
+        if attr == 'model':
+            raise AttributeError(attr)
+        return getattr(self.model, attr)
+
+    def predict(self, X):
+        start = time.perf_counter()
+        predictions = self.model.predict(X)
+        self.stats.record(time.perf_counter() - start, predictions)
+        self.registry.submit_shadow(self, X, predictions)
+        return predictions
+
+
+class ModelRegistry:
+    """All model versions of this worker, with routing and shadow scoring."""
+
+    def __init__(self, default_model, default_features, directory=REGISTRY_DIR,
+                 traffic=TRAFFIC_SPLIT, shadow=SHADOW_VERSION, default_fingerprint=None,
+                 previous=None):
+        """
+        previous is the registry this one replaces after a reload: versions
+        with the same model fingerprint keep its loaded model and stats.
+        """
+        self.directory = directory
+        self.versions = {
+            DEFAULT_VERSION: ModelVersion(DEFAULT_VERSION, default_model, default_features, self,
+                                          fingerprint=default_fingerprint)
+        }
+        self.errors = {}
+        self._load_directory(previous)
+        if previous is not None:
+            self._carry_stats(previous)
+
+        self.traffic = parse_traffic_split(traffic)
+        unknown = [name for name in self.traffic if name not in self.versions]
+        if unknown:
+            raise RegistryError(f'Traffic split names unknown versions: {", ".join(unknown)}')
+
+        if shadow and shadow not in self.versions:
+            raise RegistryError(f'Shadow version "{shadow}" is not in the registry')
+        self.shadow_name = shadow or None
+
+        self._shadow_executor = None
+        self._shadow_pending = 0
+        self._shadow_dropped = 0
+        self._shadow_lock = threading.Lock()
+        self._closed = False
+
+    def _load_directory(self, previous=None):
+        if not os.path.isdir(self.directory):
+            return
+        for name in sorted(os.listdir(self.directory)):
+            folder = os.path.join(self.directory, name)
+            model_path = os.path.join(folder, MODEL_FILE)
+            if name == DEFAULT_VERSION or not os.path.isfile(model_path):
+                continue
+            try:
+                fingerprint = model_fingerprint(model_path)
+                old = previous.versions.get(name) if previous is not None else None
+                if old is not None and old.fingerprint == fingerprint:
+                    # Unchanged since the last load: reuse it
+                    model, features = old.model, old.feature_names
+                else:
+                    model = joblib.load(model_path)
+                    features = joblib.load(os.path.join(folder, FEATURES_FILE))
+                    print(f"✓ Registry model loaded: {name}")
+                if list(features) != scoring.FEATURE_COLUMNS:
+                    # Callers build feature matrices in FEATURE_COLUMNS order
+                    raise RegistryError(f'Feature list {list(features)} does not match '
+                                        f'{scoring.FEATURE_COLUMNS}')
+                self.versions[name] = ModelVersion(name, model, features, self, path=folder,
+                                                   fingerprint=fingerprint)
+            except Exception as e:
+                print(f"✗ Error loading registry model {name}: {e}")
+                self.errors[name] = str(e)
+
+    def _carry_stats(self, previous):
+        """Keep the statistics of versions whose model did not change."""
+        for name, version in self.versions.items():
+            old = previous.versions.get(name)
+            if version.fingerprint is not None and getattr(old, 'fingerprint', None) == version.fingerprint:
+                version.stats = old.stats
+                version.shadow_stats = old.shadow_stats
+
+    def get(self, name):
+        version = self.versions.get(name)
+        if version is None:
+            raise RegistryError(
+                f'Unknown model version "{name}". Available: {", ".join(self.versions)}'
+            )
+        return version
+
+    def choose(self, requested=None):
+        """Return the version a request asked for, or one picked by the traffic split."""
+        if requested:
+            return self.get(requested)
+        if self.traffic:
+            roll = random.uniform(0, 100)
+            for name, percent in self.traffic.items():
+                if roll < percent:
+                    return self.versions[name]
+                roll -= percent
+        return self.versions[DEFAULT_VERSION]
+
+    def submit_shadow(self, serving, X, predictions):
+        """Queue the shadow model on the same feature matrix, if one is configured."""
+        if self.shadow_name is None or serving.name == self.shadow_name:
+            return
+        with self._shadow_lock:
+            # Replaced by a reload: requests still in flight skip the shadow
+            if self._closed:
+                return
+            if self._shadow_pending >= SHADOW_MAX_PENDING:
+                self._shadow_dropped += 1
+                return
+            self._shadow_pending += 1
+            if self._shadow_executor is None:
+                self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow')
+            # Submitted under the lock so close() cannot shut the executor down in between
+            self._shadow_executor.submit(self._run_shadow, np.array(X, copy=True), predictions)
+
+    def close(self):
+        """Stop shadow scoring once a reload has replaced this registry."""
+        with self._shadow_lock:
+            self._closed = True
+            executor, self._shadow_executor = self._shadow_executor, None
+        if executor is not None:
+            # Queued shadow jobs still finish; the thread then exits
+            executor.shutdown(wait=False)
+
+    def _run_shadow(self, X, reference):
+        shadow = self.versions[self.shadow_name]
+        try:
+            start = time.perf_counter()
+            predictions = shadow.model.predict(X)
+            shadow.shadow_stats.record(time.perf_counter() - start, predictions)
+            shadow.shadow_stats.record_drift(predictions, reference)
+        except Exception as e:
+            print(f"✗ Shadow scoring with {self.shadow_name} failed: {e}")
+        finally:
+            with self._shadow_lock:
+                self._shadow_pending -= 1
+
+    def describe(self):
+        """Versions, routing configuration and per-version stats."""
+        with self._shadow_lock:
+            shadow = {
+                'version': self.shadow_name,
+                'pending': self._shadow_pending,
+                'dropped': self._shadow_dropped
+            }
+        return {
+            'default': DEFAULT_VERSION,
+            'directory': self.directory,
+            'traffic_split': self.traffic,
+            'shadow': shadow,
+            'versions': {
+                name: {
+                    'model_type': type(version.model).__name__,
+                    'feature_names': version.feature_names,
+                    'path': version.path,
+                    'stats': version.stats.summary(),
+                    'shadow_stats': version.shadow_stats.summary()
+                }
+                for name, version in self.versions.items()
+            },
+            'load_errors': self.errors
+        }
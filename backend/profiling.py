@@ -0,0 +1,120 @@
+"""
+Opt-in per-request profiling for the Flask app.
+
+Set UIDAI_PROFILE_TOKEN to enable it. A request that carries the token in an
+X-Profile header or a ?profile= query parameter runs under cProfile, which
+records every Python call made while handling it (pandas filtering, iterrows
+loops, model.predict, ...). The result is either returned inline as the top-N
+functions or written as a .prof file that snakeviz, flameprof or gprof2dot can
+turn into a flame graph.
+
+Without the token the hooks are never registered, so normal requests pay
+nothing.
+"""
+
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import uuid
+from datetime import datetime
+
+from flask import g, request
+
+PROFILE_TOKEN = os.environ.get('UIDAI_PROFILE_TOKEN', '')
+PROFILE_DIR = os.environ.get(
+    'UIDAI_PROFILE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles')
+)
+DEFAULT_TOP_N = 25
+MAX_TOP_N = 200
+
+
+def profiling_requested():
+    """True if the request carries the configured profiling token."""
+    token = request.headers.get('X-Profile') or request.args.get('profile', '')
+    # Compare bytes: compare_digest rejects non-ASCII str with TypeError
+    return bool(token) and hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode())
+
+
+def top_functions(profiler, limit):
+    """Summarize a profile as the top functions by cumulative time."""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    stats.sort_stats('cumulative')
+    functions = []
+    for func in stats.fcn_list[:limit]:
+        filename, line, name = func
+        primitive_calls, total_calls, total_time, cumulative_time, _ = stats.stats[func]
+        functions.append({
+            'function': name,
+            'file': filename,
+            'line': line,
+            'calls': total_calls,
+            'primitive_calls': primitive_calls,
+            'total_time_ms': round(total_time * 1000, 3),
+            'cumulative_time_ms': round(cumulative_time * 1000, 3)
+        })
+    return {
+        'total_time_ms': round(stats.total_tt * 1000, 3),
+        'functions': functions
+    }
+
+
+def write_profile(profiler):
+    """Dump the raw profile to PROFILE_DIR and return the file name."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    endpoint = (request.endpoint or 'unknown').replace('.', '_')
+    filename = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}_{endpoint}_{uuid.uuid4().hex[:8]}.prof"
+    profiler.dump_stats(os.path.join(PROFILE_DIR, filename))
+    return filename
+
+
+def register_profiling(app):
+    """Attach the profiling hooks to app if UIDAI_PROFILE_TOKEN is set."""
+    if not PROFILE_TOKEN:
+        return False
+
+    @app.before_request
+    def start_profiler():
+        if profiling_requested():
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler per process, so a
+                # request that overlaps another profiled one runs unprofiled
+                return
+            g.profiler = profiler
+
+    @app.after_request
+    def finish_profiler(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return response
+        profiler.disable()
+
+        output = request.headers.get('X-Profile-Output') or request.args.get('profile_output', 'inline')
+        if output == 'file':
+            response.headers['X-Profile-File'] = write_profile(profiler)
+            return response
+
+        limit = request.args.get('profile_top', DEFAULT_TOP_N, type=int)
+        summary = top_functions(profiler, max(1, min(limit, MAX_TOP_N)))
+        body = response.get_json(silent=True)
+        if isinstance(body, dict):
+            body['profile'] = summary
+            response.set_data(app.json.dumps(body))
+        else:
+            # Non-object bodies are left untouched; keep the profile on disk
+            response.headers['X-Profile-File'] = write_profile(profiler)
+        return response
+
+    @app.teardown_request
+    def stop_profiler(exc):
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+
+    print(f"✓ Request profiling enabled (profiles in {PROFILE_DIR})")
+    return True
@@ -0,0 +1,219 @@
+"""
+Allocation of mobile enrolment units and camp-days across districts.
+
+Each district's exposure is its exclusion risk, weighted by centre stress and
+by the month's update workload:
+
+    exposure = AERS * (ASI / 100) * (b + c + d)
+
+A mobile unit clears unit_capacity updates a month, i.e. a share
+f = min(1, unit_capacity / workload) of what is left, so each further unit
+in the same district removes less risk than the one before. Camp-days do the
+same for the child mandatory biometric share of the workload,
+MBU / (1 + MBU) = c / (b + c + d), at camp_day_capacity child updates a day.
+
+Because the gains in every district only shrink, taking the largest marginal
+gains until the budget runs out is optimal. All (district, k-th unit) gains
+are laid out as one matrix and ranked with a single sort: mobile units across
+the whole country first, then camp-days within each state's own budget on the
+risk the units leave behind.
+"""
+
+import time
+
+import numpy as np
+
+# Updates one mobile unit handles in a month, and child updates per camp-day
+DEFAULT_UNIT_CAPACITY = 2000
+DEFAULT_CAMP_DAY_CAPACITY = 300
+
+# Most units and camp-days a single district can take in a month
+DEFAULT_MAX_UNITS_PER_DISTRICT = 10
+DEFAULT_MAX_CAMP_DAYS_PER_DISTRICT = 30
+
+# Largest budgets accepted. They do not size the work: the gain matrices are
+# districts x max units (or camp-days) per district, capped by the caller
+MAX_MOBILE_UNITS = 100000
+MAX_CAMP_DAYS = 100000
+
+
+class ScheduleError(ValueError):
+    """Raised for invalid capacity parameters (answered with 400)."""
+
+
+def parse_count(data, key, default, upper, lower=0):
+    """Read an integer parameter within [lower, upper]."""
+    value = data.get(key, default)
+    try:
+        count = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ScheduleError(f'{key} must be an integer')
+    if count < lower or count > upper or count != float(value):
+        raise ScheduleError(f'{key} must be a whole number between {lower} and {upper}')
+    return count
+
+
+def parse_camp_days(camp_days, states):
+    """
+    Camp-day budget per state: one number for every state, or a
+    {state: days} object (states left out get none).
+    """
+    if isinstance(camp_days, dict):
+        unknown = [state for state in camp_days if state not in states]
+        if unknown:
+            raise ScheduleError(f'Unknown states in camp_days: {", ".join(unknown)}')
+        return {state: parse_count(camp_days, state, 0, MAX_CAMP_DAYS) for state in states}
+    days = parse_count({'camp_days': camp_days}, 'camp_days', 0, MAX_CAMP_DAYS)
+    return {state: days for state in states}
+
+
+def marginal_gains(base, share, cap):
+    """(districts x cap) risk removed by the 1st, 2nd, ... unit in each district."""
+    k = np.arange(cap)
+    return base[:, None] * share[:, None] * (1 - share[:, None]) ** k
+
+
+def select_gains(gains, groups, budgets):
+    """
+    Pick the largest gains within each group's budget.
+
+    groups gives every row's group number and budgets each group's number of
+    units. Returns the units per row and, per group, the gain of the last
+    unit given and of the best unit left out.
+    """
+    n_rows, cap = gains.shape
+    flat = gains.ravel()
+    rows = np.repeat(np.arange(n_rows), cap)
+    entry_groups = groups[rows]
+
+    positive = flat > 0
+    flat, rows, entry_groups = flat[positive], rows[positive], entry_groups[positive]
+
+    # Best gain first within each group; rank = position inside the group
+    order = np.lexsort((-flat, entry_groups))
+    flat, rows, entry_groups = flat[order], rows[order], entry_groups[order]
+    group_start = np.searchsorted(entry_groups, np.arange(len(budgets)))
+    rank = np.arange(len(flat)) - group_start[entry_groups]
+    selected = rank < budgets[entry_groups]
+
+    counts = np.bincount(rows[selected], minlength=n_rows)
+    used = np.bincount(entry_groups[selected], minlength=len(budgets))
+
+    last_gain = np.full(len(budgets), np.inf)
+    np.minimum.at(last_gain, entry_groups[selected], flat[selected])
+    last_gain[np.isinf(last_gain)] = 0.0
+    next_gain = np.zeros(len(budgets))
+    np.maximum.at(next_gain, entry_groups[~selected], flat[~selected])
+    return counts, used, last_gain, next_gain
+
+
+def allocate(frame, mobile_units, camp_days, unit_capacity=DEFAULT_UNIT_CAPACITY,
+             camp_day_capacity=DEFAULT_CAMP_DAY_CAPACITY,
+             max_units=DEFAULT_MAX_UNITS_PER_DISTRICT,
+             max_camp_days=DEFAULT_MAX_CAMP_DAYS_PER_DISTRICT):
+    """
+    Allocate the budgets across the districts of frame.
+
+    frame has one row per district with state, district, asi, aers, mbu,
+    b, c and d. camp_days maps every state of frame to its camp-day budget.
+    Returns a JSON-ready dict.
+    """
+    start = time.perf_counter()
+    asi = frame['asi'].to_numpy(dtype=float)
+    aers = frame['aers'].to_numpy(dtype=float)
+    mbu = frame['mbu'].to_numpy(dtype=float)
+    workload = (frame['b'].to_numpy(dtype=float) + frame['c'].to_numpy(dtype=float)
+                + frame['d'].to_numpy(dtype=float))
+    child = frame['c'].to_numpy(dtype=float)
+    exposure = aers * (asi / 100) * workload
+
+    # Mobile units: one national budget
+    unit_share = np.minimum(1.0, unit_capacity / np.maximum(workload, 1.0))
+    unit_gains = marginal_gains(exposure, unit_share, max_units)
+    national = np.zeros(len(frame), dtype=int)
+    units, units_used, unit_last, unit_next = select_gains(
+        unit_gains, national, np.array([mobile_units]))
+    after_units = exposure * (1 - unit_share) ** units
+
+    # Camp-days: each state's budget on the child share of what is left
+    states, state_ids = np.unique(frame['state'].to_numpy(dtype=str), return_inverse=True)
+    child_share = mbu / (1 + mbu)
+    camp_share = np.minimum(1.0, camp_day_capacity / np.maximum(child, 1.0))
+    camp_gains = marginal_gains(after_units * child_share, camp_share, max_camp_days)
+    state_budgets = np.array([camp_days.get(state, 0) for state in states])
+    days, days_used, camp_last, camp_next = select_gains(camp_gains, state_ids, state_budgets)
+    residual = after_units * ((1 - child_share) + child_share * (1 - camp_share) ** days)
+
+    def gain_at(gains, counts, offset):
+        # Gain of unit number counts + offset (1-based), 0 outside the matrix
+        index = counts + offset - 1
+        valid = (index >= 0) & (index < gains.shape[1])
+        values = np.zeros(len(counts))
+        values[valid] = gains[np.flatnonzero(valid), index[valid]]
+        return values
+
+    reduction = exposure - residual
+    allocated = np.flatnonzero((units > 0) | (days > 0))
+    allocated = allocated[np.argsort(-reduction[allocated], kind='stable')]
+
+    columns = {
+        'state': frame['state'].to_numpy()[allocated].tolist(),
+        'district': frame['district'].to_numpy()[allocated].tolist(),
+        'asi': np.round(asi[allocated], 2).tolist(),
+        'aers': np.round(aers[allocated], 4).tolist(),
+        'mbu': np.round(mbu[allocated], 4).tolist(),
+        'workload': np.round(workload[allocated], 2).tolist(),
+        'risk': np.round(exposure[allocated], 4).tolist(),
+        'mobile_units': units[allocated].tolist(),
+        'camp_days': days[allocated].tolist(),
+        'risk_after': np.round(residual[allocated], 4).tolist(),
+        'reduction': np.round(reduction[allocated], 4).tolist()
+    }
+    marginal = {
+        'last_mobile_unit': np.round(gain_at(unit_gains, units, 0)[allocated], 4).tolist(),
+        'next_mobile_unit': np.round(gain_at(unit_gains, units, 1)[allocated], 4).tolist(),
+        'last_camp_day': np.round(gain_at(camp_gains, days, 0)[allocated], 4).tolist(),
+        'next_camp_day': np.round(gain_at(camp_gains, days, 1)[allocated], 4).tolist()
+    }
+    allocations = [
+        {**{key: values[i] for key, values in columns.items()},
+         'marginal_reduction': {key: values[i] for key, values in marginal.items()}}
+        for i in range(len(allocated))
+    ]
+
+    total_before = float(exposure.sum())
+    total_after = float(residual.sum())
+    return {
+        'districts_count': int(len(frame)),
+        'allocated_districts': int(len(allocated)),
+        'risk': {
+            'before': round(total_before, 4),
+            'after': round(total_after, 4),
+            'reduction': round(total_before - total_after, 4),
+            'reduction_pct': round((1 - total_after / total_before) * 100, 2) if total_before > 0 else 0.0
+        },
+        'mobile_units': {
+            'budget': mobile_units,
+            'used': int(units_used[0]),
+            # Risk removed by the last unit given out, and by one more unit
+            'marginal_reduction': round(float(unit_last[0]), 4),
+            'next_unit_reduction': round(float(unit_next[0]), 4)
+        },
+        'camp_days': {
+            state: {
+                'budget': int(state_budgets[i]),
+                'used': int(days_used[i]),
+                'marginal_reduction': round(float(camp_last[i]), 4),
+                'next_unit_reduction': round(float(camp_next[i]), 4)
+            }
+            for i, state in enumerate(states.tolist())
+        },
+        'parameters': {
+            'unit_capacity': unit_capacity,
+            'camp_day_capacity': camp_day_capacity,
+            'max_units_per_district': max_units,
+            'max_camp_days_per_district': max_camp_days
+        },
+        'allocations': allocations,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)
+    }
@@ -0,0 +1,224 @@
+"""
+Server-sent score updates after a data or model refresh.
+
+After every (re)load the worker takes one snapshot of the rounded district
+scores (ASI, AERS, MBU, RP per state, district and month) and of the state
+aggregates shown by /aggregate. A refresh is diffed against the previous
+snapshot once, and only the entries that changed are pushed to every
+subscriber of /events. Dashboards no longer have to poll /aggregate and
+/history to find out whether new data has landed.
+
+Each subscriber holds a worker thread for as long as it stays connected, so
+subscribers are capped per worker (UIDAI_MAX_SUBSCRIBERS) and the admission
+pools are sized from the threads left over. Recent events are kept so a
+reconnecting EventSource can catch up from its Last-Event-ID.
+"""
+
+import json
+import os
+import queue
+import threading
+from collections import deque
+
+import numpy as np
+
+import admission
+
+# Counted in the admission thread budget (see admission.py)
+MAX_SUBSCRIBERS = admission.MAX_SUBSCRIBERS
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_SECONDS = int(os.environ.get('UIDAI_EVENTS_HEARTBEAT', '15'))
+
+# Events kept for reconnecting clients, and events queued per slow subscriber
+HISTORY_SIZE = 20
+SUBSCRIBER_QUEUE = 10
+
+# Row layout of the district entries in every event
+DISTRICT_FIELDS = ['state', 'district', 'month', 'asi', 'aers', 'mbu', 'rp']
+
+
+def build_snapshot(scored_df):
+    """
+    Rounded scores of every (state, district, month) and the aggregate of
+    each state's latest month, from the precomputed score columns.
+    """
+    keys = zip(scored_df['state'].tolist(), scored_df['district'].tolist(), scored_df['month'].tolist())
+    values = zip(
+        np.round(scored_df['score_asi'].to_numpy(dtype=float), 2).tolist(),
+        np.round(scored_df['score_aers'].to_numpy(dtype=float), 4).tolist(),
+        np.round(scored_df['score_mbu'].to_numpy(dtype=float), 4).tolist(),
+        np.round(scored_df['score_rp'].to_numpy(dtype=float), 4).tolist()
+    )
+    districts = dict(zip(keys, values))
+
+    latest = scored_df[scored_df['month'] == scored_df.groupby('state')['month'].transform('max')]
+    grouped = latest.groupby('state', sort=True).agg(
+        month=('month', 'first'),
+        districts_count=('district', 'size'),
+        asi=('score_asi', 'mean'),
+        aers=('score_aers', 'mean'),
+        mbu=('score_mbu', 'mean'),
+        rp=('score_rp', 'mean'),
+        biometric=('B', 'sum'),
+        child=('C', 'sum'),
+        demographic=('D', 'sum')
+    )
+    states = {}
+    for state, row in grouped.iterrows():
+        states[state] = {
+            'month': row['month'],
+            'districts_count': int(row['districts_count']),
+            'average': {
+                'asi': round(float(row['asi']), 2),
+                'aers': round(float(row['aers']), 4),
+                'mbu': round(float(row['mbu']), 4),
+                'rp': round(float(row['rp']), 4)
+            },
+            'workload': {
+                'biometric': round(float(row['biometric']), 2),
+                'child': round(float(row['child']), 2),
+                'demographic': round(float(row['demographic']), 2)
+            }
+        }
+    return {'districts': districts, 'states': states}
+
+
+def diff_snapshots(old, new):
+    """Only the districts, months and states whose values changed or disappeared."""
+    changed = [
+        [*key, *values] for key, values in new['districts'].items()
+        if old['districts'].get(key) != values
+    ]
+    removed = [list(key) for key in old['districts'] if key not in new['districts']]
+    return {
+        'districts': {'fields': DISTRICT_FIELDS, 'changed': changed, 'removed': removed},
+        'states': {
+            'changed': {
+                state: summary for state, summary in new['states'].items()
+                if old['states'].get(state) != summary
+            },
+            'removed': [state for state in old['states'] if state not in new['states']]
+        }
+    }
+
+
+class Subscriber:
+    """One connected client: a bounded queue of pending events."""
+
+    def __init__(self):
+        self.events = queue.Queue(maxsize=SUBSCRIBER_QUEUE)
+        # Set when the client fell too far behind; its stream then ends
+        self.overflowed = False
+
+
+class ScoreFeed:
+    """The worker's current snapshot, recent events and connected subscribers."""
+
+    def __init__(self, max_subscribers=MAX_SUBSCRIBERS):
+        self.max_subscribers = max_subscribers
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.version = None
+        self.last_id = 0
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self.subscribers = set()
+
+    def update(self, scored_df, version):
+        """
+        Take a snapshot after a (re)load and push the diff to subscribers.
+
+        The first snapshot is only the baseline, and a refresh that changed
+        no score (e.g. a file that was only touched) publishes nothing.
+        Returns the published event, or None.
+        """
+        snapshot = build_snapshot(scored_df)
+        with self.lock:
+            previous, previous_version = self.snapshot, self.version
+            self.snapshot, self.version = snapshot, version
+            if previous is None or version == previous_version:
+                return None
+            diff = diff_snapshots(previous, snapshot)
+            if not any(diff['districts'][key] or diff['states'][key] for key in ('changed', 'removed')):
+                return None
+            self.last_id += 1
+            event = {
+                'id': self.last_id,
+                'version': version,
+                'previous_version': previous_version,
+                **diff
+            }
+            self.history.append(event)
+            subscribers = list(self.subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.events.put_nowait(event)
+            except queue.Full:
+                subscriber.overflowed = True
+        return event
+
+    def subscribe(self, last_event_id=None):
+        """
+        Register a subscriber, or return None when the worker is full.
+
+        Returns (subscriber, missed) where missed lists the events after
+        last_event_id still in history, or None if the client must resync.
+        """
+        with self.lock:
+            if len(self.subscribers) >= self.max_subscribers:
+                return None
+            subscriber = Subscriber()
+            self.subscribers.add(subscriber)
+            missed = []
+            if last_event_id is not None and last_event_id != self.last_id:
+                missed = [event for event in self.history if event['id'] > last_event_id]
+                # Ids from another worker or evicted from history: start over
+                if last_event_id > self.last_id or missed[0]['id'] != last_event_id + 1:
+                    missed = None
+            return subscriber, missed
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def stream(self, subscriber, missed):
+        """Yield the SSE text for one subscriber until it disconnects."""
+        try:
+            yield f'retry: {HEARTBEAT_SECONDS * 1000}\n'
+            yield format_event('hello', {'version': self.version, 'last_event_id': self.last_id})
+            if missed is None:
+                # Too far behind to replay: refetch /aggregate and /history
+                yield format_event('resync', {'version': self.version})
+            else:
+                for event in missed:
+                    yield format_event('scores', event, event['id'])
+
+            while not subscriber.overflowed:
+                try:
+                    event = subscriber.events.get(timeout=HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield format_event('scores', event, event['id'])
+
+            yield format_event('resync', {'version': self.version})
+        finally:
+            self.unsubscribe(subscriber)
+
+    def describe(self):
+        with self.lock:
+            return {
+                'version': self.version,
+                'last_event_id': self.last_id,
+                'subscribers': len(self.subscribers),
+                'max_subscribers': self.max_subscribers
+            }
+
+
+def format_event(name, data, event_id=None):
+    lines = [f'event: {name}']
+    if event_id is not None:
+        lines.insert(0, f'id: {event_id}')
+    lines.append('data: ' + json.dumps(data, separators=(',', ':')))
+    return '\n'.join(lines) + '\n\n'
@@ -0,0 +1,106 @@
+"""
+Vectorized scoring kernel for the Aadhaar Stress and Exclusion Risk indices.
+
+Every route computes its indices here, for one row or many, in one NumPy pass:
+
+    ASI_raw = ML_Prediction + imp_c * d_c + imp_d * d_d + imp_e * d_e
+    MBU     = c / (b + d + 1e-6)
+    RP      = (b - c) / (b + 1e-6)
+    AERS    = ASI_raw * (MBU + RP)
+
+ASI is reported on a 0-100 scale as |ML_Prediction| * 100 + 50 (clipped) and
+AERS on a 0-1 scale as |AERS| (clipped).
+"""
+
+import numpy as np
+
+# Model inputs, in the order the model was trained on
+FEATURE_COLUMNS = ['d_e', 'd_d', 'd_c', 'd_b_lag1', 'd_b_lag2', 'd_c_lag1', 'month_num']
+
+# Used when the model exposes no feature importances at all
+DEFAULT_IMPORTANCES = (0.34, 0.33, 0.33)
+
+# Decimal places of each index in API responses
+DECIMALS = {'asi': 2, 'aers': 4, 'mbu': 4, 'rp': 4, 'ml_prediction': 6}
+
+
+def get_importances(model):
+    """Return (imp_e, imp_d, imp_c), falling back per value if fewer than 3 exist."""
+    if hasattr(model, 'feature_importances_'):
+        importances = model.feature_importances_
+        imp_e = importances[0] if len(importances) > 0 else 0.33
+        imp_d = importances[1] if len(importances) > 1 else 0.33
+        imp_c = importances[2] if len(importances) > 2 else 0.34
+        return imp_e, imp_d, imp_c
+    return DEFAULT_IMPORTANCES
+
+
+def score_indices(ml_prediction, d_e, d_d, d_c, b, c, d, importances):
+    """
+    Compute all indices from model outputs and drivers (scalars or arrays).
+
+    Returns a dict of float arrays: ml_prediction, asi, aers, mbu, rp.
+    """
+    imp_e, imp_d, imp_c = importances
+    ml_prediction, d_e, d_d, d_c, b, c, d = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (ml_prediction, d_e, d_d, d_c, b, c, d))
+    )
+
+    asi_raw = (1.0 * ml_prediction) + (imp_c * d_c) + (imp_d * d_d) + (imp_e * d_e)
+    mbu = c / (b + d + 1e-6)
+    rp = (b - c) / (b + 1e-6)
+    aers_raw = asi_raw * (mbu + rp)
+
+    return {
+        'ml_prediction': ml_prediction,
+        'asi': np.clip(np.abs(ml_prediction) * 100 + 50, 0, 100),
+        'aers': np.clip(np.abs(aers_raw), 0, 1),
+        'mbu': mbu,
+        'rp': rp
+    }
+
+
+def score(predictor, features, b, c, d, importances=None):
+    """
+    Score a feature matrix (n rows x FEATURE_COLUMNS) with one predict call.
+
+    importances default to the predictor's own; pass them explicitly when
+    the predictor has none (e.g. the surrogate tree).
+    """
+    features = np.asarray(features, dtype=float)
+    if features.ndim == 1:
+        features = features[np.newaxis, :]
+    if importances is None:
+        importances = get_importances(predictor)
+    ml_prediction = predictor.predict(features)
+    return score_indices(ml_prediction, features[:, 0], features[:, 1], features[:, 2],
+                         b, c, d, importances)
+
+
+def load_columns(df):
+    """Return the b, c, d load arrays of a master-data frame (B/C/D, else b/c/d)."""
+    columns = []
+    for upper, lower, default in (('B', 'b', 100), ('C', 'c', 25), ('D', 'd', 50)):
+        if upper in df.columns:
+            columns.append(df[upper].to_numpy(dtype=float))
+        elif lower in df.columns:
+            columns.append(df[lower].to_numpy(dtype=float))
+        else:
+            columns.append(np.full(len(df), float(default)))
+    return tuple(columns)
+
+
+def score_frame(predictor, df, importances=None):
+    """Score every row of a master-data frame; returns the score_indices dict."""
+    b, c, d = load_columns(df)
+    return score(predictor, df[FEATURE_COLUMNS].to_numpy(dtype=float), b, c, d, importances)
+
+
+def rounded(values, ndigits):
+    """Round an array to a list of Python floats (as the JSON responses report them)."""
+    return [round(v, ndigits) for v in np.asarray(values, dtype=float).tolist()]
+
+
+def rounded_scores(scores):
+    """Round every index of a score_indices dict to its response precision."""
+    return {key: rounded(scores[key], ndigits) for key, ndigits in DECIMALS.items()}
@@ -0,0 +1,284 @@
+"""
+Distilled low-latency surrogate for the risk model.
+
+The gradient boosting ensemble in uidai_risk_model.pkl is distilled into a
+single regression tree trained on its own predictions, over the rows of
+processed_master_data.csv plus synthetic points sampled from the feature space
+(including the manual-input defaults used by the sliders). The tree is stored
+as plain NumPy arrays, so serving it needs neither sklearn nor the ensemble.
+
+The file records a fingerprint of the model it was distilled from; the app
+refuses a surrogate whose fingerprint does not match the model it loaded.
+
+Usage:
+    python surrogate.py [--max-depth 14] [--samples 200000] [--output uidai_surrogate_model.pkl]
+
+The command prints the accuracy gap against the full model, overall and per
+feature range, and stores the same report in the output file.
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SURROGATE_FILE = 'uidai_surrogate_model.pkl'
+
+# Quantile bins per feature in the accuracy report
+REPORT_BINS = 5
+
+# Share of the real rows kept out of training for the accuracy report
+TEST_SHARE = 0.2
+
+
+def model_fingerprint(path):
+    """Hash of a model file, to tie a surrogate to the model it distills."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+class TreeSurrogate:
+    """Regression tree held as flat arrays and evaluated with NumPy."""
+
+    def __init__(self, arrays, feature_names, report=None, trained_at=None,
+                 model_fingerprint=None):
+        self.left = np.asarray(arrays['left'])
+        self.right = np.asarray(arrays['right'])
+        self.feature = np.asarray(arrays['feature'])
+        self.threshold = np.asarray(arrays['threshold'])
+        self.value = np.asarray(arrays['value'])
+        self.depth = int(arrays['depth'])
+        self.feature_names = list(feature_names)
+        self.report = report or {}
+        self.trained_at = trained_at
+        self.model_fingerprint = model_fingerprint
+        # Plain lists make the single-row walk a few microseconds
+        self._nodes = list(zip(self.left.tolist(), self.right.tolist(),
+                               self.feature.tolist(), self.threshold.tolist()))
+        self._values = self.value.tolist()
+
+    @classmethod
+    def from_sklearn(cls, tree, feature_names, **kwargs):
+        t = tree.tree_
+        arrays = {
+            'left': t.children_left.copy(),
+            'right': t.children_right.copy(),
+            'feature': t.feature.copy(),
+            'threshold': t.threshold.copy(),
+            'value': t.value[:, 0, 0].copy(),
+            'depth': tree.get_depth()
+        }
+        return cls(arrays, feature_names, **kwargs)
+
+    @classmethod
+    def load(cls, path):
+        saved = joblib.load(path)
+        return cls(saved['tree'], saved['feature_names'],
+                   report=saved.get('report'), trained_at=saved.get('trained_at'),
+                   model_fingerprint=saved.get('model_fingerprint'))
+
+    def save(self, path):
+        joblib.dump({
+            'tree': {
+                'left': self.left,
+                'right': self.right,
+                'feature': self.feature,
+                'threshold': self.threshold,
+                'value': self.value,
+                'depth': self.depth
+            },
+            'feature_names': self.feature_names,
+            'report': self.report,
+            'trained_at': self.trained_at,
+            'model_fingerprint': self.model_fingerprint
+        }, path)
+
+    @property
+    def n_features_in_(self):
+        return len(self.feature_names)
+
+    def predict(self, X):
+        """Predict for a 2-D array of rows in feature_names order."""
+        X = np.asarray(X, dtype=float)
+        if len(X) == 1:
+            return np.array([self.predict_one(X[0].tolist())])
+        rows = np.arange(len(X))
+        node = np.zeros(len(X), dtype=np.intp)
+        for _ in range(self.depth):
+            left = self.left[node]
+            internal = left != -1
+            if not internal.any():
+                break
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(internal, np.where(go_left, left, self.right[node]), node)
+        return self.value[node]
+
+    def predict_one(self, row):
+        """Predict for a single row given as a list of floats."""
+        node = 0
+        left, right, feature, threshold = self._nodes[0]
+        while left != -1:
+            node = left if row[feature] <= threshold else right
+            left, right, feature, threshold = self._nodes[node]
+        return self._values[node]
+
+
+def sample_training_features(real, feature_names, n_samples, rng):
+    """
+    Build the distillation inputs from real feature rows: the rows
+    themselves, jittered copies, uniform samples within their range, and
+    manual-input style rows (zero biometric lags, d_c_lag1 = 0.9 * d_c).
+    """
+    month_idx = feature_names.index('month_num')
+    low = np.percentile(real, 1, axis=0)
+    high = np.percentile(real, 99, axis=0)
+    spread = real.std(axis=0)
+
+    n_each = max(n_samples // 3, 1)
+
+    jittered = real[rng.integers(0, len(real), n_each)]
+    jittered = jittered + rng.normal(0, 0.25, jittered.shape) * spread
+
+    uniform = rng.uniform(low, high, (n_each, len(feature_names)))
+
+    manual = rng.uniform(low, high, (n_samples - 2 * n_each, len(feature_names)))
+    for name in ('d_b_lag1', 'd_b_lag2'):
+        if name in feature_names:
+            manual[:, feature_names.index(name)] = 0.0
+    if 'd_c_lag1' in feature_names and 'd_c' in feature_names:
+        manual[:, feature_names.index('d_c_lag1')] = manual[:, feature_names.index('d_c')] * 0.9
+
+    synthetic = np.vstack([jittered, uniform, manual])
+    synthetic[:, month_idx] = rng.integers(1, 13, len(synthetic))
+    return np.vstack([real, synthetic])
+
+
+def accuracy_report(full_pred, fast_pred, X, feature_names):
+    """Accuracy gap of the surrogate, overall and per feature quantile bin."""
+    error = np.abs(fast_pred - full_pred)
+    # Gap on the served 0-100 ASI scale
+    asi_full = np.clip(np.abs(full_pred) * 100 + 50, 0, 100)
+    asi_fast = np.clip(np.abs(fast_pred) * 100 + 50, 0, 100)
+    asi_error = np.abs(asi_fast - asi_full)
+
+    report = {
+        'samples': int(len(X)),
+        'mae': float(error.mean()),
+        'p95_error': float(np.percentile(error, 95)),
+        'max_error': float(error.max()),
+        'asi_mae': float(asi_error.mean()),
+        'asi_p95_error': float(np.percentile(asi_error, 95)),
+        'by_feature': {}
+    }
+
+    for i, name in enumerate(feature_names):
+        bins = pd.qcut(X[:, i], REPORT_BINS, duplicates='drop')
+        grouped = pd.DataFrame({'bin': bins, 'error': error, 'asi_error': asi_error}).groupby(
+            'bin', observed=True)
+        report['by_feature'][name] = [
+            {
+                'low': float(interval.left),
+                'high': float(interval.right),
+                'samples': int(len(group)),
+                'mae': float(group['error'].mean()),
+                'max_error': float(group['error'].max()),
+                'asi_mae': float(group['asi_error'].mean())
+            }
+            for interval, group in grouped
+        ]
+    return report
+
+
+def distill(model, feature_names, master_df, max_depth=14, min_samples_leaf=10,
+            n_samples=200000, seed=42, fingerprint=None):
+    """
+    Fit a TreeSurrogate to the model's predictions and measure the gap.
+
+    fingerprint is model_fingerprint() of the model file, saved with the
+    surrogate so it is never served next to a different model.
+    """
+    from sklearn.tree import DecisionTreeRegressor
+
+    feature_names = list(feature_names)
+    rng = np.random.default_rng(seed)
+
+    # Real rows are split so the report is measured on rows never trained on
+    real = master_df[feature_names].to_numpy(dtype=float)
+    shuffled = rng.permutation(len(real))
+    n_test = max(int(len(real) * TEST_SHARE), 1)
+    real_test, real_train = real[shuffled[:n_test]], real[shuffled[n_test:]]
+
+    X_train = sample_training_features(real_train, feature_names, n_samples, rng)
+    y_train = model.predict(pd.DataFrame(X_train, columns=feature_names))
+
+    tree = DecisionTreeRegressor(max_depth=max_depth, min_samples_leaf=min_samples_leaf,
+                                 random_state=seed)
+    tree.fit(X_train, y_train)
+
+    # Held-out real rows, plus fresh synthetic points drawn around them
+    X_test = sample_training_features(real_test, feature_names, max(n_samples // 4, 1000), rng)
+    surrogate = TreeSurrogate.from_sklearn(tree, feature_names,
+                                           trained_at=datetime.now().isoformat(),
+                                           model_fingerprint=fingerprint)
+    full_pred = model.predict(pd.DataFrame(X_test, columns=feature_names))
+    surrogate.report = accuracy_report(full_pred, surrogate.predict(X_test),
+                                       X_test, feature_names)
+    surrogate.report.update({'max_depth': max_depth, 'leaves': int(tree.get_n_leaves()),
+                             'training_samples': int(len(X_train)),
+                             'held_out_rows': int(n_test)})
+    return surrogate
+
+
+def print_report(report):
+    print(f"  Leaves: {report['leaves']} (max depth {report['max_depth']}), "
+          f"trained on {report['training_samples']} samples")
+    print(f"  Measured on {report['samples']} unseen samples "
+          f"({report['held_out_rows']} held-out real rows)")
+    print(f"  ML prediction MAE {report['mae']:.5f}, p95 {report['p95_error']:.5f}, "
+          f"max {report['max_error']:.5f}")
+    print(f"  ASI (0-100) MAE {report['asi_mae']:.3f}, p95 {report['asi_p95_error']:.3f}")
+    for name, bins in report['by_feature'].items():
+        print(f"  {name}:")
+        for b in bins:
+            print(f"    [{b['low']:>10.4f}, {b['high']:>10.4f}]  n={b['samples']:<7} "
+                  f"mae={b['mae']:.5f}  max={b['max_error']:.5f}  asi_mae={b['asi_mae']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Distill the risk model into a fast surrogate tree.')
+    parser.add_argument('--max-depth', type=int, default=14)
+    parser.add_argument('--min-samples-leaf', type=int, default=10)
+    parser.add_argument('--samples', type=int, default=200000,
+                        help='Synthetic samples added to the real rows')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=os.path.join(BASE_DIR, SURROGATE_FILE))
+    args = parser.parse_args()
+
+    model_path = os.path.join(BASE_DIR, 'uidai_risk_model.pkl')
+    model = joblib.load(model_path)
+    feature_names = joblib.load(os.path.join(BASE_DIR, 'model_features.pkl'))
+    master_df = pd.read_csv(os.path.join(BASE_DIR, 'processed_master_data.csv'))
+    master_df.columns = master_df.columns.str.strip()
+
+    start = time.perf_counter()
+    surrogate = distill(model, feature_names, master_df, max_depth=args.max_depth,
+                        min_samples_leaf=args.min_samples_leaf, n_samples=args.samples,
+                        seed=args.seed, fingerprint=model_fingerprint(model_path))
+    print(f"✓ Surrogate distilled in {time.perf_counter() - start:.1f}s")
+    print_report(surrogate.report)
+
+    surrogate.save(args.output)
+    print(f"✓ Saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    """The API module with the model and master data loaded synchronously."""
+    os.environ.pop('UIDAI_LAZY_LOAD', None)
+    import app
+    if app.resources.model is None or app.resources.master_df is None:
+        pytest.skip('Model or master data not available')
+    return app
+
+
+@pytest.fixture(scope='session')
+def client(app_module):
+    return app_module.app.test_client()
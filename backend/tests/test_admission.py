@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+from flask import Flask, jsonify
+
+import admission
+
+
+@pytest.fixture
+def busy_app():
+    """
+    A Flask app with one slow endpoint held open by an event, a fast one and
+    a health probe, all behind an AdmissionController.
+    """
+    app = Flask(__name__)
+    release = threading.Event()
+    entered = threading.Event()
+
+    @app.route('/slow', methods=['GET', 'POST'])
+    def slow():
+        entered.set()
+        release.wait(5)
+        return jsonify({'ok': True})
+
+    @app.route('/fast', methods=['GET', 'POST'])
+    def fast():
+        return jsonify({'ok': True})
+
+    @app.route('/health')
+    def health_check():
+        return jsonify({'status': 'alive'})
+
+    def start(controller):
+        controller.register(app)
+        holder = threading.Thread(target=lambda: app.test_client().get('/slow'))
+        holder.start()
+        assert entered.wait(5)
+        return holder
+
+    yield app, start, release
+    release.set()
+
+
+def single_slot(queue, wait):
+    """A controller whose standard pool admits one request at a time."""
+    controller = admission.AdmissionController(threads=8, overrides={}, subscribers=0)
+    limiter = controller.pools['standard'] = admission.Limiter('standard', 1, queue, wait)
+    return controller, limiter
+
+
+def test_full_queue_is_shed_with_429(busy_app):
+    app, start, release = busy_app
+    controller, limiter = single_slot(queue=0, wait=1.0)
+    holder = start(controller)
+
+    response = app.test_client().get('/fast')
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
+    assert limiter.snapshot()['shed_queue_full'] == 1
+
+    release.set()
+    holder.join(5)
+    assert app.test_client().get('/fast').status_code == 200
+
+
+def test_wait_timeout_is_shed_with_503(busy_app):
+    app, start, release = busy_app
+    controller, limiter = single_slot(queue=1, wait=0.1)
+    holder = start(controller)
+
+    response = app.test_client().get('/fast')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert response.get_json()['limiter'] == 'standard'
+    assert limiter.snapshot()['shed_timeout'] == 1
+
+    release.set()
+    holder.join(5)
+
+
+def test_probes_bypass_full_pools(busy_app):
+    app, start, release = busy_app
+    controller, limiter = single_slot(queue=0, wait=0.1)
+    holder = start(controller)
+
+    assert app.test_client().get('/fast').status_code == 429
+    assert app.test_client().get('/health').status_code == 200
+    assert limiter.snapshot()['in_flight'] == 1
+
+    release.set()
+    holder.join(5)
+
+
+def test_large_body_is_rejected_with_413(monkeypatch):
+    monkeypatch.setattr(admission, 'DEFAULT_BODY_LIMIT', 100)
+    app = Flask(__name__)
+
+    @app.route('/fast', methods=['POST'])
+    def fast():
+        return jsonify({'ok': True})
+
+    controller = admission.AdmissionController(threads=8, overrides={}, subscribers=0)
+    controller.register(app)
+    client = app.test_client()
+
+    assert client.post('/fast', data=b'x' * 101).status_code == 413
+    assert client.post('/fast', data=b'x' * 100).status_code == 200
+    assert controller.pools['standard'].snapshot()['in_flight'] == 0
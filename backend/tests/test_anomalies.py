@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from anomalies import scan_anomalies
+
+
+def make_frame(months=8, seed=5):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for district in ('north', 'south', 'east'):
+        for m in range(months):
+            rows.append({
+                'state': 'S',
+                'district': district,
+                'month': f'2025-{m + 1:02d}',
+                'd_b': 0.1 + rng.normal(0, 0.01),
+                'd_e': 0.2 + rng.normal(0, 0.01),
+                'd_c': 0.3 + rng.normal(0, 0.01)
+            })
+    return pd.DataFrame(rows)
+
+
+def test_planted_spike_is_flagged_first():
+    df = make_frame()
+    spike = df.index[(df['district'] == 'south') & (df['month'] == '2025-06')][0]
+    df.loc[spike, 'd_e'] += 1.0
+
+    flagged = scan_anomalies(df, threshold=4.0)
+    top = flagged.iloc[0]
+    assert (top['district'], top['month'], top['driver']) == ('south', '2025-06', 'd_e')
+    assert top['severity'] >= 4.0
+    # Without the spike nothing reaches the threshold
+    assert scan_anomalies(make_frame(), threshold=4.0).empty
+
+
+def test_first_months_have_no_score():
+    flagged = scan_anomalies(make_frame(months=2), threshold=0.0)
+    assert flagged.empty
+
+
+def test_non_finite_min_severity_is_rejected(client):
+    for value in ('nan', 'inf', '-inf'):
+        assert client.get('/anomalies', query_string={'min_severity': value}).status_code == 400
+    response = client.get('/anomalies', query_string={'min_severity': '6'})
+    assert response.status_code == 200
+    assert response.get_json()['threshold'] == 6.0
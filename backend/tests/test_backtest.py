@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+import backtest
+import scoring
+
+
+def test_add_months_wraps_years():
+    assert backtest.add_months('2025-11', 1) == '2025-12'
+    assert backtest.add_months('2025-11', 2) == '2026-01'
+    assert backtest.add_months('2026-01', -1) == '2025-12'
+
+
+def test_latest_origin_matches_forecast(app_module, client):
+    df = app_module.resources.master_df
+    projections = backtest.project_origin(df, '2025-12', 4)
+    assert sorted(projections['month'].unique()) == ['2026-01', '2026-02', '2026-03', '2026-04']
+    assert sorted(projections['month_num'].unique()) == [1, 2, 3, 4]
+
+    X = projections[scoring.FEATURE_COLUMNS].to_numpy(dtype=float)
+    b, c, d = (projections[col].to_numpy(dtype=float) for col in ('b', 'c', 'd'))
+    scores = scoring.rounded_scores(scoring.score(app_module.resources.model, X, b, c, d))
+
+    locations = projections[['state', 'district']].drop_duplicates().head(25)
+    for state, district in locations.itertuples(index=False):
+        response = client.post('/forecast', json={'state': state, 'district': district})
+        assert response.status_code == 200
+        body = response.get_json()
+        expected = [body['current'], body['month1'], body['month2'], body['month3']]
+
+        rows = np.flatnonzero(((projections['state'] == state) &
+                               (projections['district'] == district)).to_numpy())
+        for h, entry in enumerate(expected, start=1):
+            i = rows[h - 1]
+            assert projections['month'].iloc[i] == entry['month']
+            for key in ('asi', 'aers', 'mbu'):
+                assert scores[key][i] == pytest.approx(entry[key]), (state, district, h, key)
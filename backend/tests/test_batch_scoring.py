@@ -0,0 +1,12 @@
+import io
+
+import batch_scoring
+
+
+def test_non_finite_rows_fail_alone():
+    body = b'{"d_e": 1}\n{"d_e": NaN}\n{"b": "inf"}\n{"month_num": 1e400}\n{"d_e": 2}\n'
+    records = batch_scoring.iter_records(io.BytesIO(body), 'ndjson')
+    (start, values, errors), = batch_scoring.iter_chunks(records, 6, chunk_size=10)
+    assert start == 0
+    assert sorted(errors) == [1, 2, 3]
+    assert values[0] is not None and values[4] is not None
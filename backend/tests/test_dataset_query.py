@@ -0,0 +1,36 @@
+import pandas as pd
+
+from dataset_query import DatasetIndex
+
+
+def make_frame():
+    return pd.DataFrame({
+        'state': ['A', 'B', 'A', 'A', 'B', 'A'],
+        'district': ['x', 'y', 'z', 'x', 'y', 'z'],
+        'month': ['2025-05', '2025-06', '2025-06', '2025-07', '2025-07', '2025-08'],
+        'AERS_current': [0.1, 0.9, 0.4, 0.7, 0.2, 0.6]
+    })
+
+
+def pages(index, **query):
+    rows, cursor = [], None
+    while True:
+        page = index.query(cursor=cursor, **query)
+        assert page['rows']
+        rows += page['rows']
+        cursor = page['next_cursor']
+        if cursor is None:
+            return rows
+
+
+def test_pages_match_pandas_without_empty_last_page():
+    df = make_frame()
+    index = DatasetIndex(df, version='v1')
+    rows = pages(index, state='A', month_from='2025-06', filters=['AERS_current>0.3'],
+                 sort='AERS_current', order='desc', limit=1)
+    expected = df[(df.state == 'A') & (df.month >= '2025-06') & (df.AERS_current > 0.3)]
+    expected = expected.sort_values('AERS_current', ascending=False)
+    assert [row['AERS_current'] for row in rows] == expected['AERS_current'].tolist()
+
+    rows = pages(index, month_from='2025-06', month_to='2025-07', limit=3)
+    assert [row['month'] for row in rows] == ['2025-06', '2025-06', '2025-07', '2025-07']
@@ -0,0 +1,79 @@
+import threading
+
+import joblib
+import numpy as np
+
+import scoring
+from model_registry import ModelRegistry, ModelVersion
+
+
+class ConstantModel:
+    feature_importances_ = np.array([0.5, 0.5])
+
+    def predict(self, X):
+        return np.zeros(len(X))
+
+
+def make_registry(tmp_path, fingerprint, previous=None):
+    return ModelRegistry(ConstantModel(), ['a', 'b'], directory=str(tmp_path), traffic='', shadow='',
+                         default_fingerprint=fingerprint, previous=previous)
+
+
+def test_reload_keeps_stats_of_unchanged_models(tmp_path):
+    old = make_registry(tmp_path, 'abc')
+    old.versions['default'].predict(np.zeros((3, 2)))
+
+    same = make_registry(tmp_path, 'abc', previous=old)
+    assert same.versions['default'].stats.rows == 3
+    retrained = make_registry(tmp_path, 'def', previous=old)
+    assert retrained.versions['default'].stats.rows == 0
+
+
+def test_closed_registry_stops_shadow_scoring(tmp_path):
+    registry = make_registry(tmp_path, 'abc')
+    registry.shadow_name = 'candidate'
+    registry.close()
+    registry.submit_shadow(registry.versions['default'], np.zeros((1, 2)), np.zeros(1))
+    assert registry._shadow_executor is None and registry._shadow_pending == 0
+
+
+class CloseOnRelease:
+    """Lock that closes the registry right after its first release."""
+
+    def __init__(self, registry):
+        self.lock = threading.Lock()
+        self.registry = registry
+        self.fired = False
+
+    def __enter__(self):
+        self.lock.acquire()
+
+    def __exit__(self, *exc):
+        self.lock.release()
+        if not self.fired:
+            self.fired = True
+            self.registry.close()
+
+
+def test_close_during_shadow_submission_never_fails_predict(tmp_path):
+    registry = make_registry(tmp_path, 'abc')
+    registry.versions['candidate'] = ModelVersion('candidate', ConstantModel(), ['a', 'b'], registry)
+    registry.shadow_name = 'candidate'
+    # A reload closes the registry just as a request leaves the shadow lock
+    registry._shadow_lock = CloseOnRelease(registry)
+    registry.versions['default'].predict(np.zeros((1, 2)))
+    assert registry._closed and registry._shadow_executor is None
+
+
+def test_versions_with_other_feature_order_are_rejected(tmp_path):
+    for name, features in (('good', scoring.FEATURE_COLUMNS),
+                           ('swapped', scoring.FEATURE_COLUMNS[::-1]),
+                           ('short', scoring.FEATURE_COLUMNS[:-1])):
+        folder = tmp_path / name
+        folder.mkdir()
+        joblib.dump(ConstantModel(), folder / 'uidai_risk_model.pkl')
+        joblib.dump(list(features), folder / 'model_features.pkl')
+
+    registry = make_registry(tmp_path, 'abc')
+    assert sorted(registry.versions) == ['default', 'good']
+    assert sorted(registry.errors) == ['short', 'swapped']
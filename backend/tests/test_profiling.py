@@ -0,0 +1,67 @@
+import os
+
+import pytest
+from flask import Flask, jsonify
+
+import profiling
+
+
+def make_app():
+    app = Flask(__name__)
+
+    @app.route('/sum')
+    def total():
+        return jsonify({'total': sum(range(1000))})
+
+    @app.route('/list')
+    def listing():
+        return jsonify([1, 2, 3])
+
+    return app
+
+
+@pytest.fixture
+def profiled(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, 'PROFILE_TOKEN', 'secret')
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    app = make_app()
+    assert profiling.register_profiling(app) is True
+    return app.test_client(), tmp_path
+
+
+def test_no_hooks_without_token(monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE_TOKEN', '')
+    app = make_app()
+    assert profiling.register_profiling(app) is False
+    assert not app.before_request_funcs and not app.after_request_funcs
+
+    body = app.test_client().get('/sum', headers={'X-Profile': ''}).get_json()
+    assert 'profile' not in body
+
+
+def test_inline_profile_is_added_to_the_body(profiled):
+    client, _ = profiled
+    body = client.get('/sum', query_string={'profile': 'secret', 'profile_top': 5}).get_json()
+    assert body['total'] == 499500
+    assert 0 < len(body['profile']['functions']) <= 5
+    assert body['profile']['total_time_ms'] >= 0
+
+
+def test_wrong_token_is_not_profiled(profiled):
+    client, _ = profiled
+    response = client.get('/sum', headers={'X-Profile': 'guess'})
+    assert 'profile' not in response.get_json()
+    assert 'X-Profile-File' not in response.headers
+
+
+def test_file_output_writes_a_prof_file(profiled):
+    client, directory = profiled
+    response = client.get('/sum', headers={'X-Profile': 'secret', 'X-Profile-Output': 'file'})
+    assert 'profile' not in response.get_json()
+    name = response.headers['X-Profile-File']
+    assert '_total_' in name and name.endswith('.prof') and os.path.isfile(directory / name)
+
+    # Non-object bodies keep their shape and the profile goes to disk
+    listed = client.get('/list', headers={'X-Profile': 'secret'})
+    assert listed.get_json() == [1, 2, 3]
+    assert os.path.isfile(directory / listed.headers['X-Profile-File'])
@@ -0,0 +1,49 @@
+def test_refresh_publishes_one_complete_bundle(app_module):
+    before = app_module.resources
+    assert app_module.load_resources(refresh=True) is True
+    after = app_module.resources
+    assert after is not before
+    assert after.dataset_index.version == after.version
+    assert set(after.location_index) == set(before.location_index)
+    assert before.model_registry._closed
+
+
+def test_failed_index_build_keeps_previous_bundle(app_module, monkeypatch):
+    before = app_module.resources
+
+    def broken(*args):
+        raise RuntimeError('index build failed')
+
+    monkeypatch.setattr(app_module, 'build_location_index', broken)
+    assert app_module.load_resources(refresh=True) is False
+    assert app_module.resources is before
+    assert app_module.load_state['status'] == 'ready'
+
+
+def test_ready_reports_loaded_resources(client):
+    response = client.get('/ready')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['status'] == 'ready' and body['model_loaded'] and body['data_loaded']
+
+
+def test_data_routes_answer_503_while_loading(app_module, client, monkeypatch):
+    monkeypatch.setitem(app_module.load_state, 'status', 'loading')
+
+    response = client.get('/metadata')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == str(app_module.RETRY_AFTER_SECONDS)
+    assert response.get_json()['status'] == 'loading'
+
+    ready = client.get('/ready')
+    assert ready.status_code == 503 and 'Retry-After' in ready.headers
+    assert client.get('/health').status_code == 200
+
+
+def test_ready_reports_load_errors(app_module, client, monkeypatch):
+    monkeypatch.setitem(app_module.load_state, 'status', 'failed')
+    monkeypatch.setitem(app_module.load_state, 'errors', ['data: missing file'])
+
+    response = client.get('/ready')
+    assert response.status_code == 503
+    assert response.get_json()['errors'] == ['data: missing file']
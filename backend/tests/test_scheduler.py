@@ -0,0 +1,85 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import scheduler
+
+
+def heap_allocation(gains, budget):
+    """Reference greedy: hand out units one at a time from a max-heap."""
+    counts = np.zeros(len(gains), dtype=int)
+    heap = [(-row[0], i) for i, row in enumerate(gains) if row[0] > 0]
+    heapq.heapify(heap)
+    for _ in range(budget):
+        if not heap:
+            break
+        _, i = heapq.heappop(heap)
+        counts[i] += 1
+        if counts[i] < gains.shape[1] and gains[i, counts[i]] > 0:
+            heapq.heappush(heap, (-gains[i, counts[i]], i))
+    return counts
+
+
+def make_frame(n=40, seed=3):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'state': rng.choice(['A', 'B', 'C'], n),
+        'district': [f'd{i}' for i in range(n)],
+        'asi': rng.uniform(50, 100, n),
+        'aers': rng.uniform(0, 1, n),
+        'mbu': rng.uniform(0, 1, n),
+        'b': rng.integers(0, 20000, n).astype(float),
+        'c': rng.integers(0, 5000, n).astype(float),
+        'd': rng.integers(0, 20000, n).astype(float)
+    })
+
+
+@pytest.mark.parametrize('budget', [0, 1, 17, 250, 10000])
+def test_selection_matches_heap_greedy(budget):
+    rng = np.random.default_rng(budget)
+    gains = scheduler.marginal_gains(rng.uniform(0, 100, 30), rng.uniform(0, 1, 30), 8)
+    counts, used, _, _ = scheduler.select_gains(gains, np.zeros(30, dtype=int), np.array([budget]))
+    expected = heap_allocation(gains, budget)
+    assert used[0] == expected.sum()
+    assert np.isclose(gains[np.arange(8) < counts[:, None]].sum(),
+                      gains[np.arange(8) < expected[:, None]].sum())
+
+
+def test_allocation_respects_budgets():
+    frame = make_frame()
+    result = scheduler.allocate(frame, mobile_units=25, camp_days={'A': 5, 'B': 0, 'C': 12})
+    assert result['mobile_units']['used'] == 25
+    assert sum(a['mobile_units'] for a in result['allocations']) == 25
+    for state, budget in {'A': 5, 'B': 0, 'C': 12}.items():
+        days = sum(a['camp_days'] for a in result['allocations'] if a['state'] == state)
+        assert days == result['camp_days'][state]['used'] <= budget
+    assert all(a['mobile_units'] <= scheduler.DEFAULT_MAX_UNITS_PER_DISTRICT for a in result['allocations'])
+    assert result['risk']['after'] <= result['risk']['before']
+
+
+def test_parse_camp_days():
+    assert scheduler.parse_camp_days(3, {'A', 'B'}) == {'A': 3, 'B': 3}
+    assert scheduler.parse_camp_days({'A': 2}, {'A', 'B'}) == {'A': 2, 'B': 0}
+    with pytest.raises(scheduler.ScheduleError):
+        scheduler.parse_camp_days({'Z': 2}, {'A'})
+    with pytest.raises(scheduler.ScheduleError):
+        scheduler.parse_camp_days(-1, {'A'})
+
+
+def test_schedule_endpoint(client):
+    response = client.post('/schedule', json={'mobile_units': 50, 'camp_days': 10})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['mobile_units']['used'] == 50
+    assert body['elapsed_ms'] < 1000
+
+    projected = client.post('/schedule', json={'month': '2026-02', 'mobile_units': 5}).get_json()
+    assert projected['is_projected'] is True
+
+    assert client.post('/schedule', json={'month': '2020-01'}).status_code == 400
+    assert client.post('/schedule', json={'mobile_units': 'many'}).status_code == 400
+    assert client.post('/schedule', json={'unit_capacity': 0}).status_code == 400
+    assert client.post('/schedule', json={'camp_day_capacity': 0}).status_code == 400
+    assert client.post('/schedule', json=[{'mobile_units': 5}]).status_code == 400
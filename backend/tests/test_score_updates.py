@@ -0,0 +1,72 @@
+import pandas as pd
+
+import admission
+from score_updates import ScoreFeed, build_snapshot, diff_snapshots
+
+
+def make_frame(asi=(60.0, 70.0, 80.0)):
+    return pd.DataFrame({
+        'state': ['A', 'A', 'B'],
+        'district': ['x', 'x', 'y'],
+        'month': ['2025-06', '2025-07', '2025-07'],
+        'score_asi': list(asi),
+        'score_aers': [0.1, 0.2, 0.3],
+        'score_mbu': [0.2, 0.2, 0.4],
+        'score_rp': [0.5, 0.5, 0.6],
+        'B': [100, 110, 50],
+        'C': [10, 12, 5],
+        'D': [40, 45, 20]
+    })
+
+
+def test_snapshot_aggregates_latest_month_per_state():
+    snapshot = build_snapshot(make_frame())
+    assert snapshot['districts'][('A', 'x', '2025-06')] == (60.0, 0.1, 0.2, 0.5)
+    assert snapshot['states']['A']['month'] == '2025-07'
+    assert snapshot['states']['A']['average']['asi'] == 70.0
+    assert snapshot['states']['A']['workload']['biometric'] == 110
+
+
+def test_diff_contains_only_changes():
+    old = build_snapshot(make_frame())
+    new = build_snapshot(make_frame(asi=(60.0, 75.0, 80.0)).iloc[1:])
+    diff = diff_snapshots(old, new)
+    assert diff['districts']['changed'] == [['A', 'x', '2025-07', 75.0, 0.2, 0.2, 0.5]]
+    assert diff['districts']['removed'] == [['A', 'x', '2025-06']]
+    assert list(diff['states']['changed']) == ['A']
+    assert diff['states']['removed'] == []
+
+
+def test_feed_pushes_one_event_per_refresh_and_replays_missed():
+    feed = ScoreFeed(max_subscribers=1)
+    assert feed.update(make_frame(), 'v1') is None
+
+    subscriber, missed = feed.subscribe()
+    assert missed == []
+    assert feed.subscribe() is None
+
+    event = feed.update(make_frame(asi=(61.0, 70.0, 80.0)), 'v2')
+    assert subscriber.events.get_nowait() is event
+    assert event['previous_version'] == 'v1'
+
+    feed.unsubscribe(subscriber)
+    _, missed = feed.subscribe(last_event_id=0)
+    assert [e['id'] for e in missed] == [1]
+    feed.subscribers.clear()
+    assert feed.subscribe(last_event_id=5)[1] is None
+
+
+def test_refresh_without_score_changes_publishes_nothing():
+    feed = ScoreFeed(max_subscribers=1)
+    feed.update(make_frame(), 'v1')
+    subscriber, _ = feed.subscribe()
+    assert feed.update(make_frame(), 'v2') is None
+    assert subscriber.events.empty()
+    assert feed.describe()['last_event_id'] == 0
+
+
+def test_subscribers_and_pools_leave_a_thread_for_probes():
+    controller = admission.AdmissionController(threads=8, subscribers=2)
+    budget = controller.thread_budget()
+    assert budget['limiter_threads'] + budget['subscriber_threads'] == 7
+    assert budget['probe_threads'] == admission.PROBE_THREADS
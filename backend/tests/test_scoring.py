@@ -0,0 +1,159 @@
+"""
+Parity tests for the shared scoring kernel.
+
+golden_responses.json holds requests to /history, /forecast, /predict (CSV,
+projected and manual), /aggregate and /batch-predict together with the
+responses the per-route scalar implementations returned before they were
+moved onto the kernel. Every response must still match exactly.
+
+After an intentional change to the scores, rewrite the goldens with:
+    python tests/test_scoring.py
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+import scoring
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden_responses.json')
+
+# Keys added to responses after the goldens were captured
+IGNORED_KEYS = {'model_version'}
+
+
+def load_golden():
+    with open(GOLDEN_FILE) as f:
+        return json.load(f)
+
+
+def strip_ignored(value):
+    if isinstance(value, dict):
+        return {k: strip_ignored(v) for k, v in value.items() if k not in IGNORED_KEYS}
+    if isinstance(value, list):
+        return [strip_ignored(v) for v in value]
+    return value
+
+
+def replay(client, case):
+    response = client.open(case['path'], method=case['method'],
+                           query_string=case['query'], json=case['json'])
+    return response.status_code, response.get_json()
+
+
+class FakeModel:
+    """Predicts a fixed value and exposes only the given importances."""
+
+    def __init__(self, prediction, importances=None):
+        self.prediction = prediction
+        if importances is not None:
+            self.feature_importances_ = np.array(importances)
+
+    def predict(self, X):
+        return np.full(len(X), self.prediction)
+
+
+@pytest.mark.parametrize('case', load_golden(), ids=lambda c: f"{c['method']} {c['path']}")
+def test_golden_response(client, case):
+    status, body = replay(client, case)
+    assert status == case['status']
+    assert strip_ignored(body) == strip_ignored(case['body'])
+
+
+def test_score_indices_matches_scalar_formula():
+    ml, d_e, d_d, d_c, b, c, d = 0.3, 0.1, -0.2, 0.05, 400.0, 120.0, 300.0
+    imp_e, imp_d, imp_c = 0.2, 0.3, 0.5
+    scores = scoring.score_indices([ml], [d_e], [d_d], [d_c], [b], [c], [d], (imp_e, imp_d, imp_c))
+
+    asi_raw = ml + imp_c * d_c + imp_d * d_d + imp_e * d_e
+    mbu = c / (b + d + 1e-6)
+    rp = (b - c) / (b + 1e-6)
+    assert scores['asi'][0] == min(max(abs(ml) * 100 + 50, 0), 100)
+    assert scores['aers'][0] == min(max(abs(asi_raw * (mbu + rp)), 0), 1)
+    assert scores['mbu'][0] == mbu
+    assert scores['rp'][0] == rp
+
+
+def test_score_clips_asi_and_aers():
+    scores = scoring.score(FakeModel(2.0), np.zeros((1, 7)), 100, 0, 0)
+    assert scores['asi'][0] == 100
+    assert scores['aers'][0] == 1
+
+
+def test_importance_fallbacks():
+    assert scoring.get_importances(FakeModel(0.0)) == scoring.DEFAULT_IMPORTANCES
+    assert scoring.get_importances(FakeModel(0.0, [0.6, 0.4])) == (0.6, 0.4, 0.34)
+
+
+def test_manual_predict_falls_back_with_few_importances(app_module):
+    # Manual mode used to index the third importance unconditionally
+    (body, status), = app_module.score_scenarios(app_module.resources, [{'d_c': 0.5}], FakeModel(0.1, [0.6, 0.4]))
+    assert status == 200
+    assert body['feature_importances'] == {'imp_e': 0.6, 'imp_d': 0.4, 'imp_c': 0.34}
+
+
+def test_batch_scores_mixed_scenarios_in_one_call(client, app_module):
+    calls = []
+
+    class CountingModel(FakeModel):
+        def predict(self, X):
+            calls.append(len(X))
+            return super().predict(X)
+
+    known = app_module.resources.scored_df.iloc[0]
+    scenarios = [
+        {'d_e': 0.1},
+        {'state': 'Nowhere', 'district': 'None', 'month': '2025-06'},
+        {'state': known['state'], 'district': known['district'], 'month': known['month']}
+    ]
+    results = app_module.score_scenarios(app_module.resources, scenarios, CountingModel(0.1, [0.6, 0.4, 0.2]))
+    assert calls == [2]
+    assert [status for _, status in results] == [200, 404, 200]
+    assert results[2][0]['location']['month'] == known['month']
+
+    body = client.post('/batch-predict', json={'scenarios': scenarios}).get_json()
+    assert 'error' in body['predictions'][1] and 'asi' in body['predictions'][2]
+
+
+def test_batch_chunk_matches_manual_predict(client, app_module, monkeypatch):
+    import batch_scoring
+
+    monkeypatch.setattr(batch_scoring, '_worker_model', app_module.resources.model)
+    bodies = [case['json'] for case in load_golden()
+              if case['path'] == '/predict' and 'state' not in case['json']]
+    values = [batch_scoring.parse_scenario(body, 6) for body in bodies]
+    text, _, _ = batch_scoring.score_chunk(0, values, {})
+
+    for line, body in zip(text.splitlines(), bodies):
+        streamed = json.loads(line)
+        _, expected = replay(client, {'path': '/predict', 'method': 'POST', 'query': None, 'json': body})
+        for key in scoring.DECIMALS:
+            assert streamed[key] == expected[key]
+
+
+
+def test_history_bulk_matches_history(client, app_module):
+    state, district = next(iter(app_module.resources.location_index))
+    single = client.get('/history', query_string={'state': state, 'district': district}).get_json()
+    bulk = client.post('/history/bulk', json={'locations': [{'state': state, 'district': district}]})
+    assert bulk.status_code == 200
+    assert bulk.get_json()['series'][0]['history'] == single['history']
+
+    assert client.post('/history/bulk', json=[{'state': state, 'district': district}]).status_code == 400
+
+
+if __name__ == '__main__':
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import app
+
+    test_client = app.app.test_client()
+    cases = load_golden()
+    for case in cases:
+        case['status'], case['body'] = replay(test_client, case)
+    with open(GOLDEN_FILE, 'w') as f:
+        json.dump(cases, f, indent=1, sort_keys=True)
+    print(f"✓ Rewrote {len(cases)} golden responses")
@@ -0,0 +1,7 @@
+def test_surrogate_matches_loaded_model(app_module):
+    assert app_module.load_surrogate() is not None
+
+
+def test_surrogate_from_other_model_is_refused(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'model_fingerprint', lambda path: 'another-model')
+    assert app_module.load_surrogate() is None
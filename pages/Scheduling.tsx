@@ -1,7 +1,7 @@
 
 import React, { useState, useEffect } from 'react';
 import { Task } from '../types';
-import { fetchRiskPrediction, getPriorityFromAERS, DEFAULT_PREDICTION_INPUT, type RiskPrediction } from '../services/apiService';
+import { fetchSchedule, getPriorityFromAERS, DEFAULT_SCHEDULE_INPUT, type ScheduleResponse } from '../services/apiService';
 
 const INITIAL_TASKS: Task[] = [
     { id: 'SCH-001', title: 'Database Maintenance Window', description: 'Perform routine maintenance on primary database cluster including index optimization and log cleanup.', date: '2023-10-24', priority: 'High', status: 'Pending' },
@@ -18,29 +18,32 @@ const Scheduling: React.FC = () => {
     const [filterPriority, setFilterPriority] = useState<string>('All');
     const [showNewTaskModal, setShowNewTaskModal] = useState(false);
 
-    // ML Model State
-    const [prediction, setPrediction] = useState<RiskPrediction | null>(null);
+    // ML Model State: capacity allocated across all districts by the backend
+    const [schedule, setSchedule] = useState<ScheduleResponse | null>(null);
     const [isLoadingPrediction, setIsLoadingPrediction] = useState(false);
     const [mlPriorityEnabled, setMlPriorityEnabled] = useState(true);
 
-    // Fetch ML prediction on mount to determine priorities
+    // District where the allocation removes the most risk
+    const prediction = schedule?.allocations[0] ?? null;
+
+    // Fetch the national capacity allocation on mount to determine priorities
     useEffect(() => {
-        const fetchPrediction = async () => {
+        const loadSchedule = async () => {
             setIsLoadingPrediction(true);
             try {
-                const result = await fetchRiskPrediction(DEFAULT_PREDICTION_INPUT);
-                setPrediction(result);
+                const result = await fetchSchedule(DEFAULT_SCHEDULE_INPUT);
+                setSchedule(result);
 
-                // Update task priorities based on AERS
-                if (mlPriorityEnabled) {
-                    updateTaskPriorities(result.aers);
+                // Update task priorities based on the top-priority district's AERS
+                if (mlPriorityEnabled && result.allocations.length > 0) {
+                    updateTaskPriorities(result.allocations[0].aers);
                 }
             } catch (error) {
-                console.error('Failed to fetch prediction for scheduling:', error);
+                console.error('Failed to fetch schedule:', error);
             }
             setIsLoadingPrediction(false);
         };
-        fetchPrediction();
+        loadSchedule();
     }, []);
 
     // Function to update task priorities based on AERS
@@ -134,6 +137,7 @@ const Scheduling: React.FC = () => {
                         <div>
                             <p className="text-sm font-bold text-gray-800">ML Risk Assessment</p>
                             <p className="text-xs text-gray-600">
+                                Top priority: <span className="font-bold">{prediction.district}, {prediction.state}</span> |
                                 AERS: <span className="font-bold">{(prediction.aers * 100).toFixed(1)}%</span> |
                                 ASI: <span className="font-bold">{prediction.asi.toFixed(1)}</span> |
                                 Recommended Priority: <span className={`font-bold ${getPriorityFromAERS(prediction.aers) === 'High' ? 'text-red-600' : getPriorityFromAERS(prediction.aers) === 'Medium' ? 'text-yellow-600' : 'text-green-600'}`}>
@@ -368,21 +372,25 @@ const Scheduling: React.FC = () => {
                             <span className="material-symbols-outlined text-primary">group</span>
                             Resource Allocation
                         </h3>
+                        {schedule && (
+                            <p className="text-xs text-gray-500 mb-4">
+                                {schedule.mobile_units.used} mobile units across {schedule.allocated_districts} districts
+                                ({schedule.month}) cut exclusion risk by {schedule.risk.reduction_pct}%
+                            </p>
+                        )}
                         <div className="space-y-4">
-                            {[
-                                { name: 'Infrastructure Team', allocated: prediction ? Math.round(prediction.asi * 0.9) : 85, color: 'blue' },
-                                { name: 'Security Team', allocated: prediction ? Math.round(60 + prediction.aers * 30) : 60, color: 'green' },
-                                { name: 'Database Admins', allocated: prediction ? Math.round(prediction.asi) : 95, color: 'red' },
-                            ].map((resource, i) => (
+                            {(schedule?.allocations ?? []).slice(0, 5).map((allocation, i) => (
                                 <div key={i}>
                                     <div className="flex justify-between items-center mb-1">
-                                        <span className="text-sm text-gray-700 dark:text-gray-300">{resource.name}</span>
-                                        <span className="text-xs font-bold text-gray-500">{resource.allocated}%</span>
+                                        <span className="text-sm text-gray-700 dark:text-gray-300">{allocation.district}, {allocation.state}</span>
+                                        <span className="text-xs font-bold text-gray-500">
+                                            {allocation.mobile_units} units · {allocation.camp_days} camp-days
+                                        </span>
                                     </div>
                                     <div className="w-full bg-gray-200 dark:bg-gray-700 rounded-full h-2">
                                         <div
-                                            className={`h-2 rounded-full bg-${resource.color}-500 transition-all`}
-                                            style={{ width: `${resource.allocated}%` }}
+                                            className="h-2 rounded-full bg-blue-500 transition-all"
+                                            style={{ width: `${allocation.risk > 0 ? (allocation.reduction / allocation.risk) * 100 : 0}%` }}
                                         ></div>
                                     </div>
                                 </div>
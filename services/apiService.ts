@@ -16,6 +16,8 @@ export interface PredictionInput {
     b: number;    // Biometric load
     c: number;    // Child load
     d: number;    // Demographic load
+    mode?: 'full' | 'fast';  // 'fast' uses the distilled surrogate (approximate)
+    model_version?: string;  // Registry version; omit to follow the traffic split
 }
 
 /**
@@ -25,6 +27,7 @@ export interface LocationPredictionInput {
     state: string;
     district: string;
     month: string;  // Format: "2025-10"
+    mode?: 'full' | 'fast';
 }
 
 /**
@@ -35,6 +38,8 @@ export interface RiskPrediction {
     aers: number;  // Aadhaar Exclusion Risk Score (0-1)
     mbu: number;   // Minor Biometric Usage ratio
     rp?: number;   // Risk Proportion (optional)
+    mode?: 'fast'; // Present when scored by the surrogate
+    model_version?: string;  // Registry version that served a full-mode prediction
     ml_prediction?: number;  // Raw ML model prediction
     feature_importances?: {
         imp_e: number;
@@ -108,6 +113,16 @@ export interface HistoryResponse {
     history: HistoryRecord[];
 }
 
+/**
+ * Bulk history response from /history/bulk endpoint
+ */
+export interface BulkHistoryResponse {
+    districts_count: number;
+    records_count: number;
+    series: HistoryResponse[];
+    missing: Array<{ state: string; district: string | null }>;
+}
+
 /**
  * Single month forecast data
  */
@@ -182,6 +197,57 @@ export interface AggregateResponse {
     all_districts: Array<{ district: string; asi: number; aers: number }>;
 }
 
+/**
+ * Query parameters for the /dataset endpoint
+ */
+export interface DatasetQuery {
+    columns?: string[];
+    state?: string;
+    district?: string;
+    month_from?: string;
+    month_to?: string;
+    where?: string[];   // e.g. ["AERS_current>0.5"]
+    sort?: string;
+    order?: 'asc' | 'desc';
+    limit?: number;
+    cursor?: string;
+}
+
+/**
+ * One page of master data rows from /dataset
+ */
+export interface DatasetPage {
+    columns: string[];
+    rows: Array<Record<string, string | number | null>>;
+    count: number;
+    limit: number;
+    next_cursor: string | null;
+    total_rows: number;
+}
+
+/**
+ * District-month flagged by the /anomalies scan
+ */
+export interface AnomalyRecord {
+    state: string;
+    district: string;
+    month: string;
+    severity: number;
+    driver: string;
+    values: Record<string, number>;
+    z_scores: Record<string, number | null>;
+}
+
+/**
+ * Anomalies response from /anomalies endpoint
+ */
+export interface AnomaliesResponse {
+    window: number;
+    threshold: number;
+    flagged_count: number;
+    anomalies: AnomalyRecord[];
+}
+
 /**
  * Batch prediction response
  */
@@ -260,6 +326,35 @@ export const fetchHistory = async (state: string, district: string): Promise<His
     }
 };
 
+/**
+ * Fetch historical time-series data for several locations in one request
+ * @param locations - The (state, district) pairs to compare
+ * @param state - Optional state whose districts are all included
+ * @returns Promise<BulkHistoryResponse>
+ */
+export const fetchBulkHistory = async (
+    locations: Array<{ state: string; district: string }>,
+    state?: string
+): Promise<BulkHistoryResponse> => {
+    try {
+        const response = await fetch(`${API_BASE_URL}/history/bulk`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ locations, state })
+        });
+
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('Error fetching bulk history:', error);
+        throw error;
+    }
+};
+
 /**
  * Fetch 3-month ahead forecast for a location
  * @param state - The state name
@@ -310,6 +405,188 @@ export const fetchStateAggregate = async (state: string): Promise<AggregateRespo
     }
 };
 
+/**
+ * Fetch one page of processed master data rows
+ * @param query - Projection, filters, sort and cursor
+ * @returns Promise<DatasetPage>
+ */
+export const fetchDatasetPage = async (query: DatasetQuery = {}): Promise<DatasetPage> => {
+    try {
+        const params = new URLSearchParams();
+        if (query.columns?.length) params.set('columns', query.columns.join(','));
+        (query.where || []).forEach(filter => params.append('where', filter));
+        (['state', 'district', 'month_from', 'month_to', 'sort', 'order', 'cursor'] as const).forEach(key => {
+            if (query[key]) params.set(key, String(query[key]));
+        });
+        if (query.limit) params.set('limit', String(query.limit));
+
+        const response = await fetch(`${API_BASE_URL}/dataset?${params.toString()}`, {
+            method: 'GET',
+        });
+
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('Error fetching dataset page:', error);
+        throw error;
+    }
+};
+
+/**
+ * Fetch district-months flagged by the anomaly scan, ranked by severity
+ * @param filters - Optional state, district, month, metric, min_severity and limit
+ * @returns Promise<AnomaliesResponse>
+ */
+export const fetchAnomalies = async (
+    filters: Record<string, string | number> = {}
+): Promise<AnomaliesResponse> => {
+    try {
+        const params = new URLSearchParams();
+        Object.entries(filters).forEach(([key, value]) => params.set(key, String(value)));
+
+        const response = await fetch(`${API_BASE_URL}/anomalies?${params.toString()}`, {
+            method: 'GET',
+        });
+
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('Error fetching anomalies:', error);
+        throw error;
+    }
+};
+
+/**
+ * Capacity constraints for the /schedule endpoint
+ */
+export interface ScheduleRequest {
+    month?: string;
+    mobile_units: number;
+    camp_days?: number | Record<string, number>;  // one budget for every state, or per state
+    states?: string[];
+    unit_capacity?: number;
+    camp_day_capacity?: number;
+    max_units_per_district?: number;
+    max_camp_days_per_district?: number;
+}
+
+export interface DistrictAllocation {
+    state: string;
+    district: string;
+    asi: number;
+    aers: number;
+    mbu: number;
+    workload: number;
+    risk: number;
+    mobile_units: number;
+    camp_days: number;
+    risk_after: number;
+    reduction: number;
+    marginal_reduction: {
+        last_mobile_unit: number;
+        next_mobile_unit: number;
+        last_camp_day: number;
+        next_camp_day: number;
+    };
+}
+
+export interface ResourceUsage {
+    budget: number;
+    used: number;
+    marginal_reduction: number;
+    next_unit_reduction: number;
+}
+
+export interface ScheduleResponse {
+    month: string;
+    is_projected: boolean;
+    districts_count: number;
+    allocated_districts: number;
+    risk: { before: number; after: number; reduction: number; reduction_pct: number };
+    mobile_units: ResourceUsage;
+    camp_days: Record<string, ResourceUsage>;
+    allocations: DistrictAllocation[];
+    elapsed_ms: number;
+}
+
+/**
+ * Allocate mobile units and camp-days across all districts for a month
+ * @param input - Capacity budgets and optional month/state filters
+ * @returns Promise<ScheduleResponse>
+ */
+export const fetchSchedule = async (input: ScheduleRequest): Promise<ScheduleResponse> => {
+    try {
+        const response = await fetch(`${API_BASE_URL}/schedule`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(input),
+        });
+
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
+        }
+
+        return await response.json();
+    } catch (error) {
+        console.error('Error fetching schedule:', error);
+        throw error;
+    }
+};
+
+/**
+ * Default capacity used by the Scheduling page
+ */
+export const DEFAULT_SCHEDULE_INPUT: ScheduleRequest = {
+    mobile_units: 200,  // Mobile enrolment units nationwide
+    camp_days: 20,      // Camp-days per state
+};
+
+export interface ScoreUpdateEvent {
+    id: number;
+    version: string;
+    previous_version: string;
+    districts: {
+        fields: string[];
+        // Rows of [state, district, month, asi, aers, mbu, rp]
+        changed: [string, string, string, number, number, number, number][];
+        removed: [string, string, string][];
+    };
+    states: {
+        changed: Record<string, Omit<AggregateResponse, 'state' | 'top_districts' | 'all_districts'>>;
+        removed: string[];
+    };
+}
+
+/**
+ * Subscribe to score updates pushed after the backend reloads its model or data
+ * @param onUpdate - Called with the changed district scores and state aggregates
+ * @param onResync - Called when updates were missed and data should be refetched
+ * @returns A function that closes the subscription
+ */
+export const subscribeScoreUpdates = (
+    onUpdate: (update: ScoreUpdateEvent) => void,
+    onResync?: () => void
+): (() => void) => {
+    const source = new EventSource(`${API_BASE_URL}/events`);
+    source.addEventListener('scores', (event) => {
+        onUpdate(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener('resync', () => onResync?.());
+    source.onerror = () => console.warn('Score update stream interrupted, reconnecting');
+    return () => source.close();
+};
+
 /**
  * Fetch risk prediction using location-based CSV lookup
  * @param input - The location prediction input (state, district, month)